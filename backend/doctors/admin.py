@@ -1,11 +1,12 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.db.models import Count
 from .models import Doctor, Specialty
 
 
 @admin.register(Doctor)
 class DoctorAdmin(UserAdmin):
-    list_display = ('username', 'email', 'first_name', 'last_name', 'active')
+    list_display = ('username', 'email', 'first_name', 'last_name', 'specialty_names', 'active')
     list_filter = ('active', 'is_staff', 'is_superuser')
     search_fields = ('username', 'first_name', 'last_name', 'email')
 
@@ -17,8 +18,24 @@ class DoctorAdmin(UserAdmin):
         ('Doctor Info', {'fields': ('phone', 'specialties', 'active')}),
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('specialties')
+
+    def specialty_names(self, obj):
+        # Reads the prefetched specialties; no query per row
+        return ", ".join(specialty.name for specialty in obj.specialties.all())
+    specialty_names.short_description = "Specialties"
+
 
 @admin.register(Specialty)
 class SpecialtyAdmin(admin.ModelAdmin):
-    list_display = ('name', 'created_at')
+    list_display = ('name', 'doctor_count', 'created_at')
     search_fields = ('name',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(doctor_count=Count('doctors'))
+
+    def doctor_count(self, obj):
+        return obj.doctor_count
+    doctor_count.short_description = "Doctors"
+    doctor_count.admin_order_field = 'doctor_count'
@@ -1,3 +1,45 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
-# Create your tests here.
+from .models import Doctor, Specialty
+
+
+class DoctorAdminTests(TestCase):
+    """Doctor changelist shows specialties from one prefetch query."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = Doctor.objects.create_superuser('admin', 'admin@example.com', 'password')
+        cls.cardiology = Specialty.objects.create(name='Cardiology')
+        cls.pediatrics = Specialty.objects.create(name='Pediatrics')
+
+    def _add_doctors(self, count):
+        start = Doctor.objects.count()
+        for i in range(start, start + count):
+            doctor = Doctor.objects.create(username=f'doctor{i}')
+            doctor.specialties.set([self.cardiology, self.pediatrics])
+
+    def _changelist_query_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/admin/doctors/doctor/')
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries.captured_queries)
+
+    def test_changelist_lists_specialties(self):
+        self.client.force_login(self.admin_user)
+        self._add_doctors(1)
+
+        response, _ = self._changelist_query_count()
+
+        self.assertContains(response, 'Cardiology, Pediatrics')
+
+    def test_changelist_query_count_does_not_grow_with_rows(self):
+        self.client.force_login(self.admin_user)
+        self._add_doctors(2)
+        _, few = self._changelist_query_count()
+
+        self._add_doctors(5)
+        _, many = self._changelist_query_count()
+
+        self.assertEqual(few, many)
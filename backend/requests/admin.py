@@ -1,27 +1,37 @@
 from django.contrib import admin
+from django.utils import timezone
 from .models import LeaveRequest, ShiftRequest, ShiftSwap
 
 
 @admin.register(LeaveRequest)
 class LeaveRequestAdmin(admin.ModelAdmin):
     list_display = ('doctor', 'leave_type', 'start_date', 'end_date', 'status')
+    list_select_related = ('doctor',)
     list_filter = ('status', 'leave_type')
     search_fields = ('doctor__username', 'doctor__first_name', 'doctor__last_name')
     readonly_fields = ('requested_at', 'reviewed_at')
     actions = ['approve_requests', 'reject_requests']
 
     def approve_requests(self, request, queryset):
-        queryset.update(status='approved')
+        # Only pending requests are reviewed, so re-running an action keeps the original reviewer
+        updated = queryset.filter(status=LeaveRequest.Status.PENDING).update(
+            status=LeaveRequest.Status.APPROVED, reviewed_at=timezone.now(), reviewed_by=request.user
+        )
+        self.message_user(request, f"Approved {updated} leave request(s).")
     approve_requests.short_description = "Approve selected requests"
 
     def reject_requests(self, request, queryset):
-        queryset.update(status='rejected')
+        updated = queryset.filter(status=LeaveRequest.Status.PENDING).update(
+            status=LeaveRequest.Status.REJECTED, reviewed_at=timezone.now(), reviewed_by=request.user
+        )
+        self.message_user(request, f"Rejected {updated} leave request(s).")
     reject_requests.short_description = "Reject selected requests"
 
 
 @admin.register(ShiftRequest)
 class ShiftRequestAdmin(admin.ModelAdmin):
     list_display = ('doctor', 'shift', 'request_type', 'priority', 'status')
+    list_select_related = ('doctor', 'shift')
     list_filter = ('status', 'request_type')
     search_fields = ('doctor__username',)
 
@@ -29,6 +39,7 @@ class ShiftRequestAdmin(admin.ModelAdmin):
 @admin.register(ShiftSwap)
 class ShiftSwapAdmin(admin.ModelAdmin):
     list_display = ('requesting_doctor', 'target_doctor', 'shift', 'status')
+    list_select_related = ('requesting_doctor', 'target_doctor', 'shift')
     list_filter = ('status',)
     search_fields = ('requesting_doctor__username', 'target_doctor__username')
     readonly_fields = ('requested_at', 'responded_at', 'admin_reviewed_at')
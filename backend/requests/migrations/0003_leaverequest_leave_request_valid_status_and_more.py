@@ -0,0 +1,28 @@
+# Generated by Django 5.0.1 on 2026-10-15 00:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requests', '0002_remove_leaverequest_requests_le_status_56d20c_idx_and_more'),
+        ('schedules', '0004_schedule_schedule_valid_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='leaverequest',
+            constraint=models.CheckConstraint(check=models.Q(('status__in', ['pending', 'approved', 'rejected', 'cancelled'])), name='leave_request_valid_status'),
+        ),
+        migrations.AddConstraint(
+            model_name='shiftrequest',
+            constraint=models.CheckConstraint(check=models.Q(('status__in', ['pending', 'fulfilled', 'unfulfilled'])), name='shift_request_valid_status'),
+        ),
+        migrations.AddConstraint(
+            model_name='shiftswap',
+            constraint=models.CheckConstraint(check=models.Q(('status__in', ['pending', 'accepted', 'rejected', 'approved', 'cancelled'])), name='shift_swap_valid_status'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.0.1 on 2026-10-15 00:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requests', '0003_leaverequest_leave_request_valid_status_and_more'),
+        ('schedules', '0004_schedule_schedule_valid_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='shiftrequest',
+            name='requests_sh_doctor__146b79_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='shiftrequest',
+            name='requests_sh_shift_i_3d48d8_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='shiftswap',
+            name='requests_sh_status_d872f9_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='shiftswap',
+            name='requests_sh_request_7a183b_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='shiftswap',
+            name='requests_sh_target__797d63_idx',
+        ),
+        migrations.AddIndex(
+            model_name='shiftrequest',
+            index=models.Index(fields=['shift', 'status'], name='shiftreq_shift_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shiftswap',
+            index=models.Index(fields=['status', 'requesting_doctor'], name='swap_status_requester_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shiftswap',
+            index=models.Index(fields=['status', 'target_doctor'], name='swap_status_target_idx'),
+        ),
+    ]
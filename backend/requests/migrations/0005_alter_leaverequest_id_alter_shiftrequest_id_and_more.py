@@ -0,0 +1,29 @@
+# Generated by Django 5.0.1 on 2026-10-15 01:23
+
+import rota_scheduler.utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requests', '0004_remove_shiftrequest_requests_sh_doctor__146b79_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='leaverequest',
+            name='id',
+            field=models.UUIDField(default=rota_scheduler.utils.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='shiftrequest',
+            name='id',
+            field=models.UUIDField(default=rota_scheduler.utils.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='shiftswap',
+            name='id',
+            field=models.UUIDField(default=rota_scheduler.utils.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
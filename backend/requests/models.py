@@ -1,40 +1,52 @@
-import uuid
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
 
+from rota_scheduler.utils import uuid7
+
+
+class LeaveType(models.TextChoices):
+    VACATION = 'vacation', 'Vacation'
+    STUDY_LEAVE = 'study_leave', 'Study Leave'
+    PRACTICE_DEVELOPMENT = 'practice_development', 'Practice Development'
+    SICK = 'sick', 'Sick Leave'
+    OTHER = 'other', 'Other'
+
+
+class LeaveStatus(models.TextChoices):
+    PENDING = 'pending', 'Pending'
+    APPROVED = 'approved', 'Approved'
+    REJECTED = 'rejected', 'Rejected'
+    CANCELLED = 'cancelled', 'Cancelled'
+
+
+class ShiftRequestType(models.TextChoices):
+    EXTRA = 'extra', 'Extra Shift'
+    PREFERENCE = 'preference', 'Preference'
+
+
+class ShiftRequestStatus(models.TextChoices):
+    PENDING = 'pending', 'Pending'
+    FULFILLED = 'fulfilled', 'Fulfilled'
+    UNFULFILLED = 'unfulfilled', 'Unfulfilled'
+
+
+class ShiftSwapStatus(models.TextChoices):
+    PENDING = 'pending', 'Pending'
+    ACCEPTED = 'accepted', 'Accepted by Target'
+    REJECTED = 'rejected', 'Rejected by Target'
+    APPROVED = 'approved', 'Approved by Admin'
+    CANCELLED = 'cancelled', 'Cancelled'
+
 
 class LeaveRequest(models.Model):
     """
     Requests for vacation, study leave, or practice development days.
     """
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-
-    # Leave type choices
-    TYPE_VACATION = 'vacation'
-    TYPE_STUDY_LEAVE = 'study_leave'
-    TYPE_PRACTICE_DEVELOPMENT = 'practice_development'
-    TYPE_SICK = 'sick'
-    TYPE_OTHER = 'other'
-    TYPE_CHOICES = {
-        TYPE_VACATION: 'Vacation',
-        TYPE_STUDY_LEAVE: 'Study Leave',
-        TYPE_PRACTICE_DEVELOPMENT: 'Practice Development',
-        TYPE_SICK: 'Sick Leave',
-        TYPE_OTHER: 'Other',
-    }
-
-    # Status choices
-    STATUS_PENDING = 'pending'
-    STATUS_APPROVED = 'approved'
-    STATUS_REJECTED = 'rejected'
-    STATUS_CANCELLED = 'cancelled'
-    STATUS_CHOICES = {
-        STATUS_PENDING: 'Pending',
-        STATUS_APPROVED: 'Approved',
-        STATUS_REJECTED: 'Rejected',
-        STATUS_CANCELLED: 'Cancelled',
-    }
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+
+    Type = LeaveType
+    Status = LeaveStatus
 
     doctor = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -45,12 +57,12 @@ class LeaveRequest(models.Model):
     end_date = models.DateField()
     leave_type = models.CharField(
         max_length=30,
-        choices=TYPE_CHOICES,
+        choices=Type.choices,
     )
     status = models.CharField(
         max_length=20,
-        choices=STATUS_CHOICES,
-        default=STATUS_PENDING,
+        choices=Status.choices,
+        default=Status.PENDING,
     )
     notes = models.TextField(blank=True)
     requested_at = models.DateTimeField(auto_now_add=True)
@@ -69,14 +81,18 @@ class LeaveRequest(models.Model):
         ordering = ['-requested_at']
         indexes = [
             models.Index(fields=['doctor', 'start_date', 'end_date']),
-            models.Index(fields=['status']),
+            models.Index(fields=['status', 'start_date', 'end_date'], name='leave_status_daterange_idx'),
             models.Index(fields=['leave_type']),
         ]
         constraints = [
             models.CheckConstraint(
                 check=models.Q(end_date__gte=models.F('start_date')),
                 name='end_date_after_start_date'
-            )
+            ),
+            models.CheckConstraint(
+                check=models.Q(status__in=LeaveStatus.values),
+                name='leave_request_valid_status'
+            ),
         ]
 
     def __str__(self):
@@ -87,25 +103,10 @@ class ShiftRequest(models.Model):
     """
     Requests for extra shifts or shift preferences.
     """
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-
-    # Request type choices
-    TYPE_EXTRA = 'extra'
-    TYPE_PREFERENCE = 'preference'
-    TYPE_CHOICES = {
-        TYPE_EXTRA: 'Extra Shift',
-        TYPE_PREFERENCE: 'Preference',
-    }
-
-    # Status choices
-    STATUS_PENDING = 'pending'
-    STATUS_FULFILLED = 'fulfilled'
-    STATUS_UNFULFILLED = 'unfulfilled'
-    STATUS_CHOICES = {
-        STATUS_PENDING: 'Pending',
-        STATUS_FULFILLED: 'Fulfilled',
-        STATUS_UNFULFILLED: 'Unfulfilled',
-    }
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+
+    Type = ShiftRequestType
+    Status = ShiftRequestStatus
 
     doctor = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -119,7 +120,7 @@ class ShiftRequest(models.Model):
     )
     request_type = models.CharField(
         max_length=20,
-        choices=TYPE_CHOICES,
+        choices=Type.choices,
     )
     priority = models.IntegerField(
         default=1,
@@ -127,8 +128,8 @@ class ShiftRequest(models.Model):
     )
     status = models.CharField(
         max_length=20,
-        choices=STATUS_CHOICES,
-        default=STATUS_PENDING,
+        choices=Status.choices,
+        default=Status.PENDING,
     )
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -137,10 +138,15 @@ class ShiftRequest(models.Model):
     class Meta:
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['doctor']),
-            models.Index(fields=['shift']),
+            models.Index(fields=['shift', 'status'], name='shiftreq_shift_status_idx'),
             models.Index(fields=['status']),
         ]
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(status__in=ShiftRequestStatus.values),
+                name='shift_request_valid_status'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.doctor} - {self.shift} ({self.get_request_type_display()})"
@@ -150,21 +156,9 @@ class ShiftSwap(models.Model):
     """
     Requests to swap shifts between doctors.
     """
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-
-    # Status choices
-    STATUS_PENDING = 'pending'
-    STATUS_ACCEPTED = 'accepted'
-    STATUS_REJECTED = 'rejected'
-    STATUS_APPROVED = 'approved'
-    STATUS_CANCELLED = 'cancelled'
-    STATUS_CHOICES = {
-        STATUS_PENDING: 'Pending',
-        STATUS_ACCEPTED: 'Accepted by Target',
-        STATUS_REJECTED: 'Rejected by Target',
-        STATUS_APPROVED: 'Approved by Admin',
-        STATUS_CANCELLED: 'Cancelled',
-    }
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+
+    Status = ShiftSwapStatus
 
     schedule = models.ForeignKey(
         'schedules.Schedule',
@@ -188,8 +182,8 @@ class ShiftSwap(models.Model):
     )
     status = models.CharField(
         max_length=20,
-        choices=STATUS_CHOICES,
-        default=STATUS_PENDING,
+        choices=Status.choices,
+        default=Status.PENDING,
     )
     notes = models.TextField(blank=True)
     requested_at = models.DateTimeField(auto_now_add=True)
@@ -208,9 +202,14 @@ class ShiftSwap(models.Model):
     class Meta:
         ordering = ['-requested_at']
         indexes = [
-            models.Index(fields=['status']),
-            models.Index(fields=['requesting_doctor']),
-            models.Index(fields=['target_doctor']),
+            models.Index(fields=['status', 'requesting_doctor'], name='swap_status_requester_idx'),
+            models.Index(fields=['status', 'target_doctor'], name='swap_status_target_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(status__in=ShiftSwapStatus.values),
+                name='shift_swap_valid_status'
+            ),
         ]
 
     def __str__(self):
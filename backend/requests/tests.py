@@ -1,3 +1,61 @@
+from datetime import date, timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+
+from doctors.models import Doctor
+from .models import LeaveRequest
+
+
+class LeaveRequestAdminTests(TestCase):
+    """The review actions record the reviewer and only touch pending requests."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = Doctor.objects.create_superuser('admin', 'admin@example.com', 'password')
+        cls.first_reviewer = Doctor.objects.create_superuser('reviewer', 'reviewer@example.com', 'password')
+        cls.doctor = Doctor.objects.create(username='doctor')
+
+    def _leave(self, status=LeaveRequest.Status.PENDING, **fields):
+        return LeaveRequest.objects.create(
+            doctor=self.doctor,
+            start_date=date(2026, 3, 2),
+            end_date=date(2026, 3, 4),
+            status=status,
+            **fields,
+        )
+
+    def _run_action(self, action, *leaves):
+        self.client.force_login(self.admin_user)
+        return self.client.post('/admin/requests/leaverequest/', {
+            'action': action,
+            '_selected_action': [str(leave.pk) for leave in leaves],
+        })
+
+    def test_approve_records_reviewer_and_time(self):
+        leave = self._leave()
+
+        response = self._run_action('approve_requests', leave)
+
+        self.assertEqual(response.status_code, 302)
+        leave.refresh_from_db()
+        self.assertEqual(leave.status, LeaveRequest.Status.APPROVED)
+        self.assertEqual(leave.reviewed_by, self.admin_user)
+        self.assertIsNotNone(leave.reviewed_at)
+
+    def test_reviewed_requests_keep_their_original_review(self):
+        reviewed_at = timezone.now() - timedelta(days=3)
+        approved = self._leave(
+            LeaveRequest.Status.APPROVED, reviewed_by=self.first_reviewer, reviewed_at=reviewed_at,
+        )
+        pending = self._leave()
+
+        self._run_action('reject_requests', approved, pending)
 
-# Create your tests here.
+        approved.refresh_from_db()
+        pending.refresh_from_db()
+        self.assertEqual(approved.status, LeaveRequest.Status.APPROVED)
+        self.assertEqual(approved.reviewed_by, self.first_reviewer)
+        self.assertEqual(approved.reviewed_at, reviewed_at)
+        self.assertEqual(pending.status, LeaveRequest.Status.REJECTED)
+        self.assertEqual(pending.reviewed_by, self.admin_user)
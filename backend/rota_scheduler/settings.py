@@ -189,3 +189,24 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
+
+# Logging - scheduler progress goes to the console; raise SCHEDULER_LOG_LEVEL to silence it
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'scheduler': {
+            'handlers': ['console'],
+            'level': os.environ.get('SCHEDULER_LOG_LEVEL', 'INFO'),
+        },
+        'tasks': {
+            'handlers': ['console'],
+            'level': os.environ.get('SCHEDULER_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
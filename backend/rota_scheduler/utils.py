@@ -0,0 +1,21 @@
+"""
+Helpers shared by the apps.
+"""
+import os
+import time
+import uuid
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Time-ordered UUID (RFC 9562 version 7) used as the primary key default on the
+    high-volume scheduling and request tables.
+
+    The top 48 bits are the Unix time in milliseconds, so new rows are appended to the
+    right-hand edge of the primary key index instead of landing on random pages.
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80 | int.from_bytes(os.urandom(10), 'big')
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    return uuid.UUID(int=value)
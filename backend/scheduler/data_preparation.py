@@ -3,13 +3,23 @@ Data preparation module for OR-Tools solver.
 Converts Django models into solver-ready data structures.
 """
 from datetime import date, timedelta
-from typing import Dict, List, Tuple
+from typing import Dict, FrozenSet, List, Set, Tuple
 from collections import defaultdict
 
+import numpy as np
+
 from doctors.models import Doctor
 from schedules.models import Shift, ScheduleConfiguration, ShiftRequirement
 from requests.models import LeaveRequest
 
+_NO_LEAVE: FrozenSet[date] = frozenset()
+
+# Small integer codes for shift types in the vectorized per-shift arrays; unknown types map to -1
+SHIFT_TYPE_CODES: Dict[str, int] = {
+    Shift.Type.DAY: 0,
+    Shift.Type.NIGHT: 1,
+}
+
 
 class SchedulerData:
     """Container for all data needed by the scheduler."""
@@ -23,7 +33,7 @@ class SchedulerData:
             raise ValueError("No active schedule configuration found")
 
         # Load all data
-        self.doctors = list(Doctor.objects.filter(active=True).prefetch_related('specialties'))
+        self.doctors = list(Doctor.objects.filter(active=True))
         self.shifts = list(Shift.objects.filter(
             date__year=year,
             date__month=month
@@ -32,21 +42,87 @@ class SchedulerData:
         self.shift_requirements = list(self.configuration.shift_requirements.all().select_related('required_specialty'))
         self.approved_leave = self._load_approved_leave()
 
-        # Create lookup indices
+        self.num_doctors = len(self.doctors)
+        self.num_shifts = len(self.shifts)
+
+        # Create lookup indices (built from the loaded rows; the solver needs the
+        # instances anyway, so a separate values_list query would only add a trip)
         self.doctor_ids = [d.id for d in self.doctors]
         self.shift_ids = [s.id for s in self.shifts]
-        self.doctor_index = {d.id: idx for idx, d in enumerate(self.doctors)}
-        self.shift_index = {s.id: idx for idx, s in enumerate(self.shifts)}
+        self.doctor_index = {pk: idx for idx, pk in enumerate(self.doctor_ids)}
+        self.shift_index = {pk: idx for idx, pk in enumerate(self.shift_ids)}
 
-        # Group doctors by specialty
-        self.doctors_by_specialty = defaultdict(list)
-        for doctor in self.doctors:
-            for specialty in doctor.specialties.all():
-                self.doctors_by_specialty[specialty.id].append(doctor)
+        # Group shifts by date once; constraint builders reuse these
+        self.daily_shifts: Dict[date, List[Shift]] = {}
+        for shift in self.shifts:
+            self.daily_shifts.setdefault(shift.date, []).append(shift)
+        self.sorted_dates = sorted(self.daily_shifts)
+        self.sorted_date_ordinals = [d.toordinal() for d in self.sorted_dates]
+        self.shift_indices_by_date: Dict[date, List[int]] = {
+            day: [self.shift_index[s.id] for s in day_shifts]
+            for day, day_shifts in self.daily_shifts.items()
+        }
+
+        # Per-shift attributes classified once, indexed by shift_idx
+        self.shift_dates = [s.date for s in self.shifts]
+        self.shift_types = [s.shift_type for s in self.shifts]
+        self.shift_is_weekend = [d.weekday() >= 5 for d in self.shift_dates]  # Sat-Sun
+
+        # The same attributes as parallel numpy arrays so validation can work on whole
+        # index arrays instead of walking Shift objects
+        self.shift_date_ordinals = np.array([d.toordinal() for d in self.shift_dates], dtype=np.int32)
+        self.shift_type_codes = np.array(
+            [SHIFT_TYPE_CODES.get(t, -1) for t in self.shift_types], dtype=np.int8
+        )
+
+        # Adjacent (night, day) shift index pairs with less than a day between them
+        self.night_to_day_pairs: List[Tuple[int, int]] = [
+            (s_idx, s_idx + 1)
+            for s_idx, (current, following) in enumerate(zip(self.shifts, self.shifts[1:]))
+            if current.shift_type == Shift.Type.NIGHT
+            and following.shift_type == Shift.Type.DAY
+            and (following.date - current.date).days <= 1
+        ]
+
+        # Maximal runs of consecutive calendar dates (a gap in the shift data starts a new run)
+        self.date_runs: List[List[date]] = []
+        ordinals = self.sorted_date_ordinals
+        for i, day in enumerate(self.sorted_dates):
+            if i and ordinals[i] - ordinals[i - 1] == 1:
+                self.date_runs[-1].append(day)
+            else:
+                self.date_runs.append([day])
+
+        # Bucket requirements by what they apply to so per-shift lookup is a few list concatenations
+        self.requirements_by_applies_to: Dict[str, List[ShiftRequirement]] = defaultdict(list)
+        for req in self.shift_requirements:
+            self.requirements_by_applies_to[req.applies_to].append(req)
+
+        # Group doctors by specialty straight from the M2M table (two id columns, one query)
+        doctor_by_id = {d.id: d for d in self.doctors}
+        specialty_pairs = Doctor.specialties.through.objects.filter(
+            doctor__active=True
+        ).values_list('doctor_id', 'specialty_id')
 
-    def _load_approved_leave(self) -> Dict[str, List[date]]:
-        """Load approved leave requests for all doctors."""
-        leave_dates = defaultdict(list)
+        self.doctors_by_specialty = defaultdict(list)
+        specialties_by_doctor = defaultdict(set)
+        for doctor_id, specialty_id in specialty_pairs:
+            if doctor_id in doctor_by_id:
+                self.doctors_by_specialty[specialty_id].append(doctor_by_id[doctor_id])
+                specialties_by_doctor[doctor_id].add(specialty_id)
+
+        self.specialties_by_doctor: Dict[str, FrozenSet[str]] = {
+            doctor_id: frozenset(specialty_ids)
+            for doctor_id, specialty_ids in specialties_by_doctor.items()
+        }
+        self.specialty_indices_cache: Dict[str, List[int]] = {
+            specialty_id: [self.doctor_index[d.id] for d in specialty_doctors]
+            for specialty_id, specialty_doctors in self.doctors_by_specialty.items()
+        }
+
+    def _load_approved_leave(self) -> Dict[str, Set[date]]:
+        """Load approved leave requests for all doctors as a set of dates per doctor."""
+        leave_dates = defaultdict(set)
 
         # Get all approved leave that overlaps with this month
         first_day = date(self.year, self.month, 1)
@@ -55,25 +131,26 @@ class SchedulerData:
         else:
             last_day = date(self.year, self.month + 1, 1) - timedelta(days=1)
 
+        # Only the FK column and the dates are needed, so skip model instantiation
         approved_requests = LeaveRequest.objects.filter(
-            status='approved',
+            status=LeaveRequest.Status.APPROVED,
             start_date__lte=last_day,
             end_date__gte=first_day
-        ).select_related('doctor')
+        ).values_list('doctor_id', 'start_date', 'end_date').iterator(chunk_size=2000)
 
-        for request in approved_requests:
-            current = max(request.start_date, first_day)
-            end = min(request.end_date, last_day)
+        for doctor_id, start_date, end_date in approved_requests:
+            start_ordinal = max(start_date, first_day).toordinal()
+            end_ordinal = min(end_date, last_day).toordinal()
 
-            while current <= end:
-                leave_dates[request.doctor.id].append(current)
-                current += timedelta(days=1)
+            leave_dates[doctor_id].update(
+                date.fromordinal(ordinal) for ordinal in range(start_ordinal, end_ordinal + 1)
+            )
 
         return leave_dates
 
     def is_doctor_on_leave(self, doctor_id: str, shift: Shift) -> bool:
         """Check if a doctor is on approved leave for a shift."""
-        return shift.date in self.approved_leave.get(doctor_id, [])
+        return shift.date in self.approved_leave.get(doctor_id, _NO_LEAVE)
 
     def get_consecutive_shifts(self, start_idx: int, count: int) -> List[Shift]:
         """Get a list of consecutive shifts starting from an index."""
@@ -81,29 +158,24 @@ class SchedulerData:
             return []
         return self.shifts[start_idx:start_idx + count]
 
-    def shift_matches_requirement(self, shift: Shift, requirement: ShiftRequirement) -> bool:
-        """Check if a shift requirement applies to a given shift."""
-        # Check applies_to filter
-        if requirement.applies_to == 'all':
-            return True
-        elif requirement.applies_to == 'day':
-            return shift.shift_type == 'day'
-        elif requirement.applies_to == 'night':
-            return shift.shift_type == 'night'
-        elif requirement.applies_to == 'weekday':
-            return shift.date.weekday() < 5  # Mon-Fri
-        elif requirement.applies_to == 'weekend':
-            return shift.date.weekday() >= 5  # Sat-Sun
-
-        return False
-
     def get_requirements_for_shift(self, shift: Shift) -> List[ShiftRequirement]:
         """Get all requirements that apply to a specific shift."""
-        return [req for req in self.shift_requirements if self.shift_matches_requirement(shift, req)]
+        shift_idx = self.shift_index[shift.id]
+        by_applies_to = self.requirements_by_applies_to
+        if self.shift_is_weekend[shift_idx]:
+            day_of_week = ShiftRequirement.AppliesTo.WEEKEND
+        else:
+            day_of_week = ShiftRequirement.AppliesTo.WEEKDAY
+
+        return (
+            by_applies_to.get(ShiftRequirement.AppliesTo.ALL, [])
+            + by_applies_to.get(self.shift_types[shift_idx], [])  # 'day'/'night' match AppliesTo.DAY/NIGHT
+            + by_applies_to.get(day_of_week, [])
+        )
 
     def doctor_has_specialty(self, doctor: Doctor, specialty_id: str) -> bool:
         """Check if a doctor has a specific specialty."""
-        return any(spec.id == specialty_id for spec in doctor.specialties.all())
+        return specialty_id in self.specialties_by_doctor.get(doctor.id, frozenset())
 
     def get_shift_by_index(self, idx: int) -> Shift:
         """Get shift by index."""
@@ -121,10 +193,7 @@ class SchedulerData:
 
     def get_daily_shifts(self) -> Dict[date, List[Shift]]:
         """Group shifts by date."""
-        daily = defaultdict(list)
-        for shift in self.shifts:
-            daily[shift.date].append(shift)
-        return daily
+        return self.daily_shifts
 
     def __str__(self):
         return (f"SchedulerData({self.year}-{self.month:02d}: "
@@ -1,117 +1,210 @@
 """
 Solution parser for converting OR-Tools solution to Django models.
 """
-from django.db import transaction
+from django.db import connection, transaction
+from django.db.models import Q
 from django.utils import timezone
 from typing import List, Tuple, Optional
+from collections import Counter
 from datetime import datetime
+from itertools import groupby
+from operator import itemgetter
+import logging
 
-from schedules.models import Schedule, ShiftAssignment, ConstraintViolation
+import numpy as np
+
+from schedules.models import Schedule, Shift, ShiftAssignment, ConstraintViolation
+from rota_scheduler.utils import uuid7
 from .solver import ScheduleSolution
-from .data_preparation import SchedulerData
+from .data_preparation import SHIFT_TYPE_CODES, SchedulerData
+
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT for bulk_create; large enough to keep round-trips low, small enough
+# to keep each statement cheap to parse
+DEFAULT_BATCH_SIZE = 500
+
+# Matches the unique_schedule_shift_doctor constraint; regenerated rows upsert on it
+ASSIGNMENT_UNIQUE_FIELDS = ['schedule', 'shift', 'doctor']
+
+# Below this many rows the raw PostgreSQL insert path is not worth bypassing the ORM for
+FAST_INSERT_THRESHOLD = 100
 
 
 class SolutionParser:
     """Parses solver solution and saves to database."""
 
-    def __init__(self, solution: ScheduleSolution, data: SchedulerData):
+    def __init__(self, solution: ScheduleSolution, data: SchedulerData,
+                 batch_size: int = DEFAULT_BATCH_SIZE):
         self.solution = solution
         self.data = data
+        self.batch_size = batch_size
         self.violations = []
 
     @transaction.atomic
-    def save_to_database(self, generated_by=None) -> Schedule:
+    def save_to_database(self, generated_by_id=None) -> Schedule:
         """
         Save the solution to the database.
 
         Args:
-            generated_by: User who generated the schedule (optional)
+            generated_by_id: Primary key of the user who generated the schedule (optional)
 
         Returns:
             Schedule object with all assignments
         """
-        print("\n" + "=" * 60)
-        print("SAVING SCHEDULE TO DATABASE")
-        print("=" * 60)
+        logger.info("SAVING SCHEDULE TO DATABASE")
 
         # Create or get Schedule object
-        schedule = self._create_or_update_schedule(generated_by)
+        schedule = self._create_or_update_schedule(generated_by_id)
 
         if not self.solution.is_feasible:
-            print("⚠️  Solution is not feasible - no assignments saved")
-            schedule.solver_status = self.solution.status
-            schedule.solver_time_seconds = self.solution.solver_time
-            schedule.notes = "Schedule generation failed - no feasible solution found"
-            schedule.save()
+            logger.warning("⚠️  Solution is not feasible - no assignments saved")
+            self._update_schedule(
+                schedule,
+                solver_status=self.solution.status,
+                solver_time_seconds=self.solution.solver_time,
+                notes="Schedule generation failed - no feasible solution found",
+            )
             return schedule
 
-        # Delete existing assignments if regenerating
-        deleted_count = schedule.assignments.all().delete()[0]
-        if deleted_count:
-            print(f"Deleted {deleted_count} existing assignments")
-
-        # Create shift assignments
-        print(f"Creating {len(self.solution.assignments)} shift assignments...")
-        assignments = self._create_assignments(schedule)
-        print(f"✓ Created {len(assignments)} shift assignments")
+        # Create shift assignments; rows kept from a previous run are upserted in place,
+        # so only assignments the new solution dropped are deleted
+        logger.info("Saving %s shift assignments...", len(self.solution.assignments))
+        created_count = self._create_assignments(schedule)
+        logger.info("✓ Saved %s shift assignments", created_count)
 
         # Validate and detect violations
-        print("\nValidating schedule...")
+        logger.info("Validating schedule...")
         self._detect_violations(schedule)
 
         if self.violations:
-            print(f"⚠️  Detected {len(self.violations)} constraint violations")
-            self._save_violations(schedule)
+            logger.warning("⚠️  Detected %s constraint violations", len(self.violations))
         else:
-            print("✓ No constraint violations detected")
+            logger.info("✓ No constraint violations detected")
+
+        # Always replace the stored violations so violation_count matches the rows
+        self._save_violations(schedule)
 
         # Update schedule metadata
-        schedule.solver_status = self.solution.status
-        schedule.solver_time_seconds = self.solution.solver_time
-        schedule.objective_value = self.solution.objective_value
-        schedule.generated_at = timezone.now()
-        schedule.save()
+        self._update_schedule(
+            schedule,
+            solver_status=self.solution.status,
+            solver_time_seconds=self.solution.solver_time,
+            objective_value=self.solution.objective_value,
+            generated_at=timezone.now(),
+            assignment_count=created_count,
+        )
 
-        print(f"\n✓ Schedule saved: {schedule}")
-        print("=" * 60 + "\n")
+        logger.info("✓ Schedule saved: %s", schedule)
 
         return schedule
 
-    def _create_or_update_schedule(self, generated_by) -> Schedule:
+    def _create_or_update_schedule(self, generated_by_id) -> Schedule:
         """Create or get existing schedule for the month/year."""
-        schedule, created = Schedule.objects.get_or_create(
+        # Only the columns __str__ needs; everything else is written with update()
+        schedule, created = Schedule.objects.only('id', 'month', 'year', 'status').get_or_create(
             month=self.data.month,
             year=self.data.year,
             defaults={
-                'status': Schedule.STATUS_DRAFT,
-                'generated_by': generated_by,
+                'status': Schedule.Status.DRAFT,
+                'generated_by_id': generated_by_id,
             }
         )
 
         if not created:
-            print(f"Found existing schedule: {schedule}")
+            logger.info("Found existing schedule: %s", schedule)
         else:
-            print(f"Created new schedule: {schedule}")
+            logger.info("Created new schedule: %s", schedule)
 
         return schedule
 
-    def _create_assignments(self, schedule: Schedule) -> List[ShiftAssignment]:
-        """Create ShiftAssignment objects from solution."""
-        assignments = []
+    def _update_schedule(self, schedule: Schedule, **fields):
+        """
+        Write only the given fields with a single UPDATE, skipping save() and its signals.
+
+        The in-memory instance is kept in sync for callers that use it afterwards.
+        """
+        fields['updated_at'] = timezone.now()
+        Schedule.objects.filter(pk=schedule.pk).update(**fields)
+
+        for name, value in fields.items():
+            setattr(schedule, name, value)
+
+    def _create_assignments(self, schedule: Schedule) -> int:
+        """Create ShiftAssignment rows from the solution and return how many were inserted."""
+        doctor_ids = self.data.doctor_ids
+        shift_ids = self.data.shift_ids
+        assignment_type = ShiftAssignment.Type.SCHEDULED
+
+        id_pairs = [
+            (doctor_ids[doctor_idx], shift_ids[shift_idx])
+            for doctor_idx, shift_idx in self.solution.assignments
+        ]
 
-        for doctor_idx, shift_idx in self.solution.assignments:
-            doctor = self.data.get_doctor_by_index(doctor_idx)
-            shift = self.data.get_shift_by_index(shift_idx)
+        self._delete_stale_assignments(schedule, id_pairs)
 
-            assignment = ShiftAssignment.objects.create(
-                schedule=schedule,
-                shift=shift,
-                doctor=doctor,
-                assignment_type=ShiftAssignment.TYPE_SCHEDULED
+        if connection.vendor == 'postgresql' and len(id_pairs) > FAST_INSERT_THRESHOLD:
+            self._insert_assignment_rows(schedule, id_pairs, assignment_type)
+        else:
+            ShiftAssignment.objects.bulk_create(
+                [
+                    ShiftAssignment(
+                        schedule_id=schedule.pk,
+                        shift_id=shift_id,
+                        doctor_id=doctor_id,
+                        assignment_type=assignment_type
+                    )
+                    for doctor_id, shift_id in id_pairs
+                ],
+                batch_size=self.batch_size,
+                update_conflicts=True,
+                unique_fields=ASSIGNMENT_UNIQUE_FIELDS,
+                update_fields=['assignment_type', 'updated_at'],
             )
-            assignments.append(assignment)
 
-        return assignments
+        return len(id_pairs)
+
+    def _delete_stale_assignments(self, schedule: Schedule, id_pairs: List[Tuple]):
+        """
+        Delete a regenerated schedule's assignments that are not in the new solution.
+
+        The kept pairs are matched in SQL with one condition per doctor, so this is a
+        single DELETE with no SELECT of the existing rows first.
+        """
+        keep = Q()
+        for doctor_id, pairs in groupby(sorted(id_pairs), key=itemgetter(0)):
+            keep |= Q(doctor_id=doctor_id, shift_id__in=[shift_id for _, shift_id in pairs])
+
+        # Nothing cascades from ShiftAssignment, so this is a fast-path DELETE
+        deleted_count, _ = ShiftAssignment.objects.filter(schedule=schedule).exclude(keep).delete()
+        if deleted_count:
+            logger.info("Deleted %s stale assignments", deleted_count)
+
+    def _insert_assignment_rows(self, schedule: Schedule, id_pairs: List[Tuple], assignment_type: str):
+        """
+        Insert assignments on PostgreSQL as plain tuples with psycopg2's execute_values.
+
+        Skips building a model instance per row; each page of batch_size rows is sent as
+        one multi-row INSERT. COPY would be faster still, but it cannot upsert, and rows
+        kept from a previous run must be updated in place (ON CONFLICT) to keep their ids.
+        """
+        from psycopg2.extras import execute_values
+
+        now = timezone.now()
+        rows = [
+            (uuid7(), schedule.pk, shift_id, doctor_id, assignment_type, now, now)
+            for doctor_id, shift_id in id_pairs
+        ]
+
+        sql = (
+            f'INSERT INTO {connection.ops.quote_name(ShiftAssignment._meta.db_table)} '
+            '(id, schedule_id, shift_id, doctor_id, assignment_type, created_at, updated_at) '
+            'VALUES %s '
+            'ON CONFLICT (schedule_id, shift_id, doctor_id) DO UPDATE SET '
+            'assignment_type = EXCLUDED.assignment_type, updated_at = EXCLUDED.updated_at'
+        )
+        with connection.cursor() as cursor:
+            execute_values(cursor.cursor, sql, rows, page_size=self.batch_size)
 
     def _detect_violations(self, schedule: Schedule):
         """
@@ -122,150 +215,210 @@ class SolutionParser:
         """
         self.violations = []
 
+        # Load the schedule's assignments once as (doctor_id, shift_id) pairs; every check
+        # below works on this list. Ordering by doctor_id alone overrides the model's
+        # shift__date ordering, so no join to Shift is needed
+        assignments = list(
+            schedule.assignments.order_by('doctor_id').values_list('doctor_id', 'shift_id')
+        )
+
         # Check coverage violations
-        self._check_coverage_violations(schedule)
+        self._check_coverage_violations(schedule, assignments)
 
         # Check doctor workload violations
-        self._check_workload_violations(schedule)
+        self._check_workload_violations(schedule, assignments)
 
         # Check consecutive shift violations
-        self._check_consecutive_shift_violations(schedule)
+        self._check_consecutive_shift_violations(schedule, assignments)
 
         # Check rest period violations
-        self._check_rest_period_violations(schedule)
+        self._check_rest_period_violations(schedule, assignments)
 
-    def _check_coverage_violations(self, schedule: Schedule):
+    def _check_coverage_violations(self, schedule: Schedule, assignments: List[Tuple]):
         """Check if any shifts are under-covered."""
-        for shift in self.data.shifts:
-            assignments = schedule.assignments.filter(shift=shift)
-            actual_count = assignments.count()
-            min_required = shift.min_doctors or self.data.configuration.default_min_doctors_per_shift
-
-            if actual_count < min_required:
-                self.violations.append({
-                    'violation_type': 'under_coverage',
-                    'severity': ConstraintViolation.SEVERITY_ERROR,
-                    'description': (f"Shift {shift} has only {actual_count} doctors "
-                                  f"(minimum: {min_required})"),
-                    'doctor': None,
-                })
-
-    def _check_workload_violations(self, schedule: Schedule):
+        counts = Counter(shift_id for _, shift_id in assignments)
+        default_min = self.data.configuration.default_min_doctors_per_shift
+
+        # Filter to the under-covered shifts first; a fully covered schedule (the
+        # normal case, since the solver enforces coverage) never reaches the append loop
+        under_covered = [
+            (shift, counts.get(shift.id, 0), shift.min_doctors or default_min)
+            for shift in self.data.shifts
+            if counts.get(shift.id, 0) < (shift.min_doctors or default_min)
+        ]
+        if not under_covered:
+            return
+
+        append = self.violations.append
+        for shift, actual_count, min_required in under_covered:
+            append(ConstraintViolation(
+                schedule_id=schedule.pk,
+                violation_type='under_coverage',
+                severity=ConstraintViolation.Severity.ERROR,
+                description=(f"Shift {shift} has only {actual_count} doctors "
+                          f"(minimum: {min_required})"),
+            ))
+
+    def _check_workload_violations(self, schedule: Schedule, assignments: List[Tuple]):
         """Check if any doctors exceed min/max shift counts."""
         config = self.data.configuration
+        min_shifts = config.min_shifts_per_doctor
+        max_shifts = config.max_shifts_per_doctor
+        append = self.violations.append
+        shift_counts = Counter(doctor_id for doctor_id, _ in assignments)
 
         for doctor in self.data.doctors:
-            shift_count = schedule.assignments.filter(doctor=doctor).count()
-
-            if shift_count < config.min_shifts_per_doctor:
-                self.violations.append({
-                    'violation_type': 'under_min_shifts',
-                    'severity': ConstraintViolation.SEVERITY_WARNING,
-                    'description': (f"Doctor {doctor.get_full_name()} has only {shift_count} shifts "
-                                  f"(minimum: {config.min_shifts_per_doctor})"),
-                    'doctor': doctor,
-                })
-
-            if shift_count > config.max_shifts_per_doctor:
-                self.violations.append({
-                    'violation_type': 'over_max_shifts',
-                    'severity': ConstraintViolation.SEVERITY_ERROR,
-                    'description': (f"Doctor {doctor.get_full_name()} has {shift_count} shifts "
-                                  f"(maximum: {config.max_shifts_per_doctor})"),
-                    'doctor': doctor,
-                })
-
-    def _check_consecutive_shift_violations(self, schedule: Schedule):
-        """Check for too many consecutive shifts."""
-        max_consecutive = self.data.configuration.max_consecutive_shifts
+            shift_count = shift_counts.get(doctor.id, 0)
+
+            if shift_count < min_shifts:
+                append(ConstraintViolation(
+                    schedule_id=schedule.pk,
+                    doctor_id=doctor.id,
+                    violation_type='under_min_shifts',
+                    severity=ConstraintViolation.Severity.WARNING,
+                    description=(f"Doctor {doctor.get_full_name()} has only {shift_count} shifts "
+                              f"(minimum: {min_shifts})"),
+                ))
+
+            if shift_count > max_shifts:
+                append(ConstraintViolation(
+                    schedule_id=schedule.pk,
+                    doctor_id=doctor.id,
+                    violation_type='over_max_shifts',
+                    severity=ConstraintViolation.Severity.ERROR,
+                    description=(f"Doctor {doctor.get_full_name()} has {shift_count} shifts "
+                              f"(maximum: {max_shifts})"),
+                ))
+
+    def _iter_shift_indices_by_doctor(self, assignments: List[Tuple]):
+        """
+        Yield (doctor, shift_indices) for each scheduled doctor.
 
-        for doctor in self.data.doctors:
-            # Get doctor's shifts in order
-            doctor_assignments = schedule.assignments.filter(doctor=doctor).select_related('shift').order_by('shift__date', 'shift__shift_type')
-            shift_indices = [self.data.shift_index[a.shift.id] for a in doctor_assignments]
+        Expects (doctor_id, shift_id) pairs grouped by doctor. shift_indices is an
+        increasing int32 array; SchedulerData orders shifts by date and type, so index
+        order is shift order.
+        """
+        doctors_by_id = {d.id: d for d in self.data.doctors}
+        shift_index = self.data.shift_index
 
-            # Check for consecutive runs
-            if len(shift_indices) < 2:
+        for doctor_id, pairs in groupby(assignments, key=itemgetter(0)):
+            doctor = doctors_by_id.get(doctor_id)
+            if doctor is not None:
+                indices = np.fromiter((shift_index[shift_id] for _, shift_id in pairs), dtype=np.int32)
+                indices.sort()
+                yield doctor, indices
+
+    def _check_consecutive_shift_violations(self, schedule: Schedule, assignments: List[Tuple]):
+        """Check for too many consecutive shifts."""
+        # MinValueValidator(1) only runs in full_clean, so 0 can still arrive here. Like the
+        # solver's one-shift windows capped at 0, it means any shift exceeds the limit
+        max_consecutive = max(self.data.configuration.max_consecutive_shifts, 0)
+        consecutive_count = max_consecutive + 1
+        append = self.violations.append
+
+        for doctor, indices in self._iter_shift_indices_by_doctor(assignments):
+            # Need more than max_consecutive shifts to exceed it
+            if len(indices) <= max_consecutive:
                 continue
 
-            consecutive_count = 1
-            for i in range(1, len(shift_indices)):
-                if shift_indices[i] == shift_indices[i-1] + 1:
-                    consecutive_count += 1
-
-                    if consecutive_count > max_consecutive:
-                        self.violations.append({
-                            'violation_type': 'too_many_consecutive_shifts',
-                            'severity': ConstraintViolation.SEVERITY_ERROR,
-                            'description': (f"Doctor {doctor.get_full_name()} has {consecutive_count} "
-                                          f"consecutive shifts (maximum: {max_consecutive})"),
-                            'doctor': doctor,
-                        })
-                        break
-                else:
-                    consecutive_count = 1
-
-    def _check_rest_period_violations(self, schedule: Schedule):
+            if max_consecutive == 0:
+                exceeded = True
+            else:
+                # Indices are strictly increasing, so spanning exactly max_consecutive index steps
+                # over max_consecutive positions means max_consecutive + 1 back-to-back shifts
+                spans = indices[max_consecutive:] - indices[:-max_consecutive]
+                exceeded = (spans == max_consecutive).any()
+
+            if exceeded:
+                append(ConstraintViolation(
+                    schedule_id=schedule.pk,
+                    doctor_id=doctor.id,
+                    violation_type='too_many_consecutive_shifts',
+                    severity=ConstraintViolation.Severity.ERROR,
+                    description=(f"Doctor {doctor.get_full_name()} has {consecutive_count} "
+                              f"consecutive shifts (maximum: {max_consecutive})"),
+                ))
+
+    def _check_rest_period_violations(self, schedule: Schedule, assignments: List[Tuple]):
         """Check for insufficient rest between shifts (night->day transitions)."""
         min_rest = self.data.configuration.min_rest_hours_between_shifts
 
         if min_rest < 12:
             return  # No restriction
 
-        for doctor in self.data.doctors:
-            doctor_assignments = schedule.assignments.filter(doctor=doctor).select_related('shift').order_by('shift__date', 'shift__shift_type')
-
-            for i in range(len(doctor_assignments) - 1):
-                current_shift = doctor_assignments[i].shift
-                next_shift = doctor_assignments[i+1].shift
-
-                # Check for night->day violation
-                if current_shift.shift_type == 'night' and next_shift.shift_type == 'day':
-                    days_apart = (next_shift.date - current_shift.date).days
-
-                    if days_apart <= 1:
-                        self.violations.append({
-                            'violation_type': 'insufficient_rest',
-                            'severity': ConstraintViolation.SEVERITY_ERROR,
-                            'description': (f"Doctor {doctor.get_full_name()} has night shift on "
-                                          f"{current_shift.date} followed by day shift on {next_shift.date} "
-                                          f"(less than {min_rest} hours rest)"),
-                            'doctor': doctor,
-                        })
-
-    def _save_violations(self, schedule: Schedule):
-        """Save detected violations to database."""
-        # Delete existing violations for this schedule
-        schedule.violations.all().delete()
-
-        # Create new violation records
-        violation_objects = [
-            ConstraintViolation(
-                schedule=schedule,
-                doctor=v['doctor'],
-                violation_type=v['violation_type'],
-                severity=v['severity'],
-                description=v['description']
+        append = self.violations.append
+        shifts = self.data.shifts
+        type_codes = self.data.shift_type_codes
+        date_ordinals = self.data.shift_date_ordinals
+        night = SHIFT_TYPE_CODES[Shift.Type.NIGHT]
+        day = SHIFT_TYPE_CODES[Shift.Type.DAY]
+
+        for doctor, indices in self._iter_shift_indices_by_doctor(assignments):
+            codes = type_codes[indices]
+
+            # Only night->day transitions matter; drop other shift types up front and
+            # skip doctors who never work a night
+            is_night = codes == night
+            if not is_night.any():
+                continue
+            keep = is_night | (codes == day)
+            indices, codes = indices[keep], codes[keep]
+
+            # Night followed by day with at most one calendar day between them
+            transitions = (
+                (codes[:-1] == night)
+                & (codes[1:] == day)
+                & (np.diff(date_ordinals[indices]) <= 1)
             )
-            for v in self.violations
-        ]
 
-        ConstraintViolation.objects.bulk_create(violation_objects)
-        print(f"✓ Saved {len(violation_objects)} violations")
+            for pos in np.flatnonzero(transitions):
+                current_shift = shifts[indices[pos]]
+                next_shift = shifts[indices[pos + 1]]
+                append(ConstraintViolation(
+                    schedule_id=schedule.pk,
+                    doctor_id=doctor.id,
+                    violation_type='insufficient_rest',
+                    severity=ConstraintViolation.Severity.ERROR,
+                    description=(f"Doctor {doctor.get_full_name()} has night shift on "
+                              f"{current_shift.date} followed by day shift on {next_shift.date} "
+                              f"(less than {min_rest} hours rest)"),
+                ))
+
+    # Inside save_to_database this joins the outer transaction without the extra
+    # SAVEPOINT/RELEASE round trips; called on its own it is still atomic
+    @transaction.atomic(savepoint=False)
+    def _save_violations(self, schedule: Schedule, **schedule_fields):
+        """
+        Save detected violations to database.
+
+        Extra schedule_fields are written in the same UPDATE as violation_count.
+        """
+        # Delete existing violations for this schedule
+        ConstraintViolation.objects.filter(schedule=schedule).delete()
+
+        # Violations are already ConstraintViolation instances bound to this schedule
+        ConstraintViolation.objects.bulk_create(self.violations, batch_size=self.batch_size)
+        self._update_schedule(schedule, violation_count=len(self.violations), **schedule_fields)
+        logger.info("✓ Saved %s violations", len(self.violations))
 
 
 def save_solution(solution: ScheduleSolution, data: SchedulerData,
-                  generated_by=None) -> Schedule:
+                  generated_by_id=None, batch_size: int = DEFAULT_BATCH_SIZE
+                  ) -> Tuple[Schedule, List[ConstraintViolation]]:
     """
     Convenience function to parse and save a solution.
 
     Args:
         solution: ScheduleSolution from solver
         data: SchedulerData used to generate solution
-        generated_by: User who generated the schedule
+        generated_by_id: Primary key of the user who generated the schedule; the
+            generated_by foreign key checks it, so no lookup is needed
+        batch_size: Rows per INSERT when saving assignments and violations
 
     Returns:
-        Schedule object
+        Tuple of the Schedule and the ConstraintViolation rows just saved for it,
+        so callers can report violations without querying them back
     """
-    parser = SolutionParser(solution, data)
-    return parser.save_to_database(generated_by)
+    parser = SolutionParser(solution, data, batch_size)
+    schedule = parser.save_to_database(generated_by_id)
+    return schedule, parser.violations
@@ -1,14 +1,18 @@
 """
 Main OR-Tools CP-SAT solver for physician scheduling.
 """
+import numpy as np
 from ortools.sat.python import cp_model
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+import logging
 import time
 
 from .data_preparation import SchedulerData
 from .constraints import ConstraintBuilder
 
+logger = logging.getLogger(__name__)
+
 
 class ScheduleSolution:
     """Container for the solution returned by the solver."""
@@ -46,7 +50,7 @@ class ScheduleSolver:
         self.timeout_seconds = timeout_seconds
         self.model = cp_model.CpModel()
         self.solver = cp_model.CpSolver()
-        self.variables = {}
+        self.variables: List[List[cp_model.IntVar]] = []  # x[doctor_idx][shift_idx]
 
         # Configure solver parameters
         self.solver.parameters.max_time_in_seconds = timeout_seconds
@@ -55,18 +59,21 @@ class ScheduleSolver:
 
     def create_decision_variables(self):
         """
-        Create binary decision variables x[(doctor_idx, shift_idx)].
-        x[(d, s)] = 1 if doctor d is assigned to shift s, else 0.
+        Create binary decision variables x[doctor_idx][shift_idx].
+        x[d][s] = 1 if doctor d is assigned to shift s, else 0.
+
+        Variables are left unnamed; CP-SAT does not need names to solve.
         """
-        print("Creating decision variables...")
+        logger.info("Creating decision variables...")
 
-        for d_idx in range(len(self.data.doctors)):
-            for s_idx in range(len(self.data.shifts)):
-                var_name = f'x_d{d_idx}_s{s_idx}'
-                self.variables[(d_idx, s_idx)] = self.model.NewBoolVar(var_name)
+        num_shifts = self.data.num_shifts
+        self.variables = [
+            [self.model.NewBoolVar('') for _ in range(num_shifts)]
+            for _ in range(self.data.num_doctors)
+        ]
 
-        print(f"✓ Created {len(self.variables)} decision variables "
-              f"({len(self.data.doctors)} doctors × {len(self.data.shifts)} shifts)")
+        logger.info("✓ Created %s decision variables (%s doctors × %s shifts)",
+                    self.data.num_doctors * num_shifts, self.data.num_doctors, num_shifts)
 
     def build_constraints(self):
         """Build all hard constraints using the ConstraintBuilder."""
@@ -90,11 +97,11 @@ class ScheduleSolver:
 
         # Simple objective: maximize total assignments
         # This provides slight preference for more coverage when possible
-        for (d_idx, s_idx), var in self.variables.items():
-            objective_terms.append(var)
+        for row in self.variables:
+            objective_terms.extend(row)
 
-        self.model.Maximize(sum(objective_terms))
-        print("✓ Objective function built")
+        self.model.Maximize(cp_model.LinearExpr.Sum(objective_terms))
+        logger.info("✓ Objective function built")
 
     def solve(self) -> ScheduleSolution:
         """
@@ -103,16 +110,22 @@ class ScheduleSolver:
         Returns:
             ScheduleSolution object with status, assignments, and metadata
         """
-        print("\n" + "=" * 60)
-        print("STARTING SCHEDULE GENERATION")
-        print("=" * 60)
-        print(f"Problem size: {len(self.data.doctors)} doctors, {len(self.data.shifts)} shifts")
-        print(f"Timeout: {self.timeout_seconds} seconds")
-        print(f"Configuration: {self.data.configuration.name}")
-        print("=" * 60 + "\n")
+        logger.info("STARTING SCHEDULE GENERATION")
+        logger.info("Problem size: %s doctors, %s shifts", self.data.num_doctors, self.data.num_shifts)
+        logger.info("Timeout: %s seconds", self.timeout_seconds)
+        logger.info("Configuration: %s", self.data.configuration.name)
 
         start_time = time.time()
 
+        # Skip CP-SAT entirely when a simple capacity count already proves infeasibility
+        if self._is_trivially_infeasible():
+            self._print_infeasibility_hints()
+            return ScheduleSolution(
+                status='INFEASIBLE',
+                assignments=[],
+                solver_time=time.time() - start_time
+            )
+
         # Step 1: Create variables
         self.create_decision_variables()
 
@@ -123,23 +136,21 @@ class ScheduleSolver:
         self.build_objective_function()
 
         # Step 4: Solve
-        print("\nInvoking CP-SAT solver...")
-        print("-" * 60)
+        logger.info("Invoking CP-SAT solver...")
         status = self.solver.Solve(self.model)
         solve_time = time.time() - start_time
 
         # Step 5: Parse results
         status_name = self.solver.StatusName(status)
-        print("-" * 60)
-        print(f"\nSolver finished in {solve_time:.2f} seconds")
-        print(f"Status: {status_name}")
+        logger.info("Solver finished in %.2f seconds", solve_time)
+        logger.info("Status: %s", status_name)
 
         if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
             assignments = self._extract_assignments()
             objective_value = self.solver.ObjectiveValue()
 
-            print(f"Objective value: {objective_value}")
-            print(f"Total assignments: {len(assignments)}")
+            logger.info("Objective value: %s", objective_value)
+            logger.info("Total assignments: %s", len(assignments))
 
             # Print coverage summary
             self._print_coverage_summary(assignments)
@@ -151,7 +162,7 @@ class ScheduleSolver:
                 objective_value=objective_value
             )
         else:
-            print("\n⚠️  No feasible solution found!")
+            logger.warning("⚠️  No feasible solution found!")
             self._print_infeasibility_hints()
 
             return ScheduleSolution(
@@ -160,6 +171,41 @@ class ScheduleSolver:
                 solver_time=solve_time
             )
 
+    def _is_trivially_infeasible(self) -> bool:
+        """
+        Cheap pre-flight check run before building the CP-SAT model.
+
+        Each doctor can work at most max_shifts_per_doctor shifts, and none on leave days.
+        If that total capacity cannot meet the summed minimum coverage, or a doctor cannot
+        reach min_shifts_per_doctor, no assignment can satisfy the hard constraints.
+        """
+        config = self.data.configuration
+        default_min = config.default_min_doctors_per_shift
+        total_required = sum(shift.min_doctors or default_min for shift in self.data.shifts)
+
+        shift_indices_by_date = self.data.shift_indices_by_date
+        total_capacity = 0
+        for doctor in self.data.doctors:
+            leave_shifts = sum(
+                len(shift_indices_by_date.get(leave_date, ()))
+                for leave_date in self.data.approved_leave.get(doctor.id, ())
+            )
+            available = self.data.num_shifts - leave_shifts
+
+            if available < config.min_shifts_per_doctor:
+                logger.warning("⚠️  Doctor %s can work at most %s shifts (minimum: %s)",
+                               doctor.get_full_name(), available, config.min_shifts_per_doctor)
+                return True
+
+            total_capacity += min(available, config.max_shifts_per_doctor)
+
+        if total_required > total_capacity:
+            logger.warning("⚠️  Shifts need %s doctor-shifts but doctors can cover at most %s",
+                           total_required, total_capacity)
+            return True
+
+        return False
+
     def _extract_assignments(self) -> List[Tuple[int, int]]:
         """
         Extract assignments from the solution.
@@ -167,67 +213,69 @@ class ScheduleSolver:
         Returns:
             List of (doctor_idx, shift_idx) tuples for assigned shifts
         """
-        assignments = []
-
-        for (d_idx, s_idx), var in self.variables.items():
-            if self.solver.Value(var) == 1:
-                assignments.append((d_idx, s_idx))
-
-        return assignments
+        boolean_value = self.solver.BooleanValue
+        return [
+            (d_idx, s_idx)
+            for d_idx, row in enumerate(self.variables)
+            for s_idx, var in enumerate(row)
+            if boolean_value(var)
+        ]
 
     def _print_coverage_summary(self, assignments: List[Tuple[int, int]]):
         """Print a summary of shift coverage."""
-        from collections import Counter
-
-        # Count doctors per shift
-        shift_coverage = Counter(s_idx for _, s_idx in assignments)
+        # Count doctors per shift and shifts per doctor in one vectorized pass each
+        pairs = np.array(assignments, dtype=np.int32).reshape(-1, 2)
+        shift_coverage = np.bincount(pairs[:, 1], minlength=self.data.num_shifts)
+        doctor_shifts = np.bincount(pairs[:, 0], minlength=self.data.num_doctors)
 
-        print("\nCoverage Summary:")
-        print("-" * 60)
+        logger.info("Coverage Summary:")
 
         # Check for under-coverage
         min_required = self.data.configuration.default_min_doctors_per_shift
         under_covered = []
 
         for s_idx, shift in enumerate(self.data.shifts):
-            coverage = shift_coverage.get(s_idx, 0)
+            coverage = int(shift_coverage[s_idx])
             min_doctors = shift.min_doctors or min_required
 
             if coverage < min_doctors:
                 under_covered.append((shift, coverage, min_doctors))
 
         if under_covered:
-            print(f"⚠️  {len(under_covered)} shifts are under-covered:")
+            logger.warning("⚠️  %s shifts are under-covered:", len(under_covered))
             for shift, actual, required in under_covered[:5]:  # Show first 5
-                print(f"  {shift.date} {shift.shift_type}: {actual}/{required} doctors")
+                logger.warning("  %s %s: %s/%s doctors", shift.date, shift.shift_type, actual, required)
             if len(under_covered) > 5:
-                print(f"  ... and {len(under_covered) - 5} more")
+                logger.warning("  ... and %s more", len(under_covered) - 5)
         else:
-            print("✓ All shifts meet minimum coverage requirements")
+            logger.info("✓ All shifts meet minimum coverage requirements")
 
         # Doctor workload summary
-        doctor_shifts = Counter(d_idx for d_idx, _ in assignments)
-        if doctor_shifts:
-            avg_shifts = sum(doctor_shifts.values()) / len(self.data.doctors)
-            min_shifts = min(doctor_shifts.values())
-            max_shifts = max(doctor_shifts.values())
+        if assignments:
+            # Only doctors with at least one shift count towards the range
+            worked = doctor_shifts[doctor_shifts > 0]
+            avg_shifts = len(assignments) / self.data.num_doctors
+            min_shifts = int(worked.min())
+            max_shifts = int(worked.max())
 
-            print(f"\nDoctor Workload:")
-            print(f"  Average: {avg_shifts:.1f} shifts")
-            print(f"  Range: {min_shifts}-{max_shifts} shifts")
+            logger.info("Doctor Workload:")
+            logger.info("  Average: %.1f shifts", avg_shifts)
+            logger.info("  Range: %s-%s shifts", min_shifts, max_shifts)
 
     def _print_infeasibility_hints(self):
         """Print hints about why the problem might be infeasible."""
-        print("\nPossible causes:")
-        print("1. Too many doctors on leave relative to shift requirements")
-        print("2. Constraints are too restrictive (try relaxing max_consecutive_shifts)")
-        print("3. Not enough active doctors to cover all shifts")
-        print("4. Skill mix requirements cannot be satisfied with available doctors")
-        print("\nSuggestions:")
-        print("- Review approved leave requests")
-        print("- Check ShiftRequirement constraints in ScheduleConfiguration")
-        print("- Ensure enough senior doctors and required specialties are active")
-        print("- Consider relaxing shift count constraints (min/max shifts per doctor)")
+        logger.warning(
+            "Possible causes:\n"
+            "1. Too many doctors on leave relative to shift requirements\n"
+            "2. Constraints are too restrictive (try relaxing max_consecutive_shifts)\n"
+            "3. Not enough active doctors to cover all shifts\n"
+            "4. Skill mix requirements cannot be satisfied with available doctors\n"
+            "Suggestions:\n"
+            "- Review approved leave requests\n"
+            "- Check ShiftRequirement constraints in ScheduleConfiguration\n"
+            "- Ensure enough senior doctors and required specialties are active\n"
+            "- Consider relaxing shift count constraints (min/max shifts per doctor)"
+        )
 
 
 def generate_schedule(month: int, year: int, timeout_seconds: int = 300) -> ScheduleSolution:
@@ -243,9 +291,9 @@ def generate_schedule(month: int, year: int, timeout_seconds: int = 300) -> Sche
         ScheduleSolution object
     """
     # Load data
-    print(f"Loading data for {year}-{month:02d}...")
+    logger.info("Loading data for %s-%02d...", year, month)
     data = SchedulerData(month, year)
-    print(f"✓ Loaded {data}")
+    logger.info("✓ Loaded %s", data)
 
     # Create and run solver
     solver = ScheduleSolver(data, timeout_seconds)
@@ -7,10 +7,10 @@ from .models import (
 
 @admin.register(Schedule)
 class ScheduleAdmin(admin.ModelAdmin):
-    list_display = ('__str__', 'status', 'generated_at', 'solver_status')
+    list_display = ('__str__', 'status', 'generated_at', 'solver_status', 'assignment_count', 'violation_count')
     list_filter = ('status', 'year', 'month')
     search_fields = ('notes',)
-    readonly_fields = ('generated_at', 'solver_time_seconds', 'objective_value')
+    readonly_fields = ('generated_at', 'solver_time_seconds', 'objective_value', 'assignment_count', 'violation_count')
 
 
 @admin.register(Shift)
@@ -23,6 +23,7 @@ class ShiftAdmin(admin.ModelAdmin):
 @admin.register(ShiftAssignment)
 class ShiftAssignmentAdmin(admin.ModelAdmin):
     list_display = ('doctor', 'shift', 'assignment_type', 'schedule')
+    list_select_related = ('doctor', 'shift', 'schedule')
     list_filter = ('assignment_type', 'schedule__status')
     search_fields = ('doctor__username', 'doctor__first_name', 'doctor__last_name')
 
@@ -30,6 +31,7 @@ class ShiftAssignmentAdmin(admin.ModelAdmin):
 @admin.register(ConstraintViolation)
 class ConstraintViolationAdmin(admin.ModelAdmin):
     list_display = ('violation_type', 'severity', 'doctor', 'schedule', 'detected_at')
+    list_select_related = ('doctor', 'schedule')
     list_filter = ('severity', 'violation_type')
     readonly_fields = ('detected_at',)
 
@@ -74,5 +76,6 @@ class ScheduleConfigurationAdmin(admin.ModelAdmin):
 @admin.register(ShiftRequirement)
 class ShiftRequirementAdmin(admin.ModelAdmin):
     list_display = ('configuration', 'applies_to', 'required_specialty', 'min_with_specialty', 'priority')
+    list_select_related = ('configuration', 'required_specialty')
     list_filter = ('applies_to', 'configuration')
     search_fields = ('configuration__name',)
@@ -1,13 +1,32 @@
 """
 Django management command to create test data for schedule generation.
 """
+from django.contrib.admin.models import LogEntry
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand
+from django.db import connection, transaction
 from django.utils import timezone
-from datetime import date, timedelta
+from datetime import date
 from decimal import Decimal
+import calendar
+import csv
+import io
 
 from doctors.models import Doctor, Specialty
-from schedules.models import Schedule, Shift, ScheduleConfiguration, ShiftRequirement
+from requests.models import LeaveRequest, ShiftRequest, ShiftSwap
+from schedules.models import (
+    ConstraintViolation, Schedule, ScheduleConfiguration, Shift, ShiftAssignment, ShiftRequirement,
+)
+
+# Models cleared by --clear, in the order the ORM fallback deletes them
+CLEARED_MODELS = (Schedule, ShiftRequirement, ScheduleConfiguration, Shift, Doctor, Specialty)
+
+# Models whose rows reference the cleared ones; the ORM cascades into them, and
+# PostgreSQL's TRUNCATE must name them since it runs without CASCADE
+DEPENDENT_MODELS = (
+    ShiftAssignment, ConstraintViolation, LeaveRequest, ShiftRequest, ShiftSwap, LogEntry,
+    Doctor.specialties.through, Doctor.groups.through, Doctor.user_permissions.through,
+)
 
 
 class Command(BaseCommand):
@@ -29,17 +48,17 @@ class Command(BaseCommand):
         parser.add_argument(
             '--clear',
             action='store_true',
-            help='Clear existing test data first'
+            help=(
+                'Clear existing test data first: doctors, specialties, shifts and configurations, '
+                'plus the schedules, assignments, violations, requests and swaps built on them'
+            )
         )
 
     def handle(self, *args, **options):
         if options['clear']:
             self.stdout.write("Clearing existing test data...")
-            ShiftRequirement.objects.all().delete()
-            ScheduleConfiguration.objects.all().delete()
-            Shift.objects.all().delete()
-            Doctor.objects.all().delete()
-            Specialty.objects.all().delete()
+            with transaction.atomic():
+                self._clear_test_data()
             self.stdout.write(self.style.SUCCESS("✓ Cleared existing data"))
 
         # Determine month/year
@@ -61,136 +80,137 @@ class Command(BaseCommand):
 
         self.stdout.write(f"\nCreating test data for {year}-{month:02d}...\n")
 
-        # Create specialties
-        self.stdout.write("Creating specialties...")
-        em_specialty, _ = Specialty.objects.get_or_create(
-            name='Emergency Medicine',
-            defaults={'description': 'Emergency and acute care'}
-        )
-        gp_specialty, _ = Specialty.objects.get_or_create(
-            name='General Practice',
-            defaults={'description': 'Primary care and family medicine'}
-        )
-        uc_specialty, _ = Specialty.objects.get_or_create(
-            name='Urgent Care Physician',
-            defaults={'description': 'Blend of EM and GP for urgent care settings'}
-        )
-        self.stdout.write(self.style.SUCCESS(f"✓ Created 3 specialties"))
-
-        # Create doctors
-        self.stdout.write("Creating doctors...")
-        doctors_data = [
-            ('Dr. Sarah Johnson', 'sjohnson', [em_specialty, uc_specialty]),
-            ('Dr. Michael Chen', 'mchen', [gp_specialty, uc_specialty]),
-            ('Dr. Emily Rodriguez', 'erodriguez', [em_specialty]),
-            ('Dr. James Wilson', 'jwilson', [gp_specialty]),
-            ('Dr. Anna Kim', 'akim', [uc_specialty]),
-            ('Dr. David Brown', 'dbrown', [gp_specialty]),
-            ('Dr. Lisa Martinez', 'lmartinez', [em_specialty, uc_specialty]),
-            ('Dr. Robert Taylor', 'rtaylor', [uc_specialty]),
-            ('Dr. Jennifer Lee', 'jlee', [gp_specialty]),
-            ('Dr. Thomas Anderson', 'tanderson', [em_specialty]),
-        ]
-
-        doctors = []
-        for full_name, username, specialties in doctors_data:
-            first_name, last_name = full_name.replace('Dr. ', '').rsplit(' ', 1)
-            doctor, created = Doctor.objects.get_or_create(
-                username=username,
-                defaults={
-                    'first_name': first_name,
-                    'last_name': last_name,
-                    'email': f'{username}@doctorsexpress.com',
-                    'active': True,
-                }
+        # Create everything in one transaction: a single commit instead of one per statement
+        with transaction.atomic():
+            # Create specialties
+            self.stdout.write("Creating specialties...")
+            em_specialty, _ = Specialty.objects.get_or_create(
+                name='Emergency Medicine',
+                defaults={'description': 'Emergency and acute care'}
             )
-            if created:
-                doctor.set_password('password123')
-                doctor.save()
-
-            doctor.specialties.set(specialties)
-            doctors.append(doctor)
-
-        self.stdout.write(self.style.SUCCESS(f"✓ Created {len(doctors)} doctors"))
-
-        # Create schedule configuration
-        self.stdout.write("Creating schedule configuration...")
-        config, created = ScheduleConfiguration.objects.get_or_create(
-            name='Default Configuration',
-            defaults={
-                'description': 'Standard urgent care scheduling rules',
-                'min_shifts_per_doctor': 14,
-                'max_shifts_per_doctor': 16,
-                'max_consecutive_shifts': 4,
-                'min_rest_hours_between_shifts': 12,
-                'max_consecutive_days_off': 5,
-                'avoid_single_day_off': True,
-                'default_min_doctors_per_shift': 2,
-                'is_active': True,
-            }
-        )
-        if created:
-            self.stdout.write(self.style.SUCCESS(f"✓ Created configuration: {config.name}"))
-        else:
-            self.stdout.write(f"  Using existing configuration: {config.name}")
-
-        # Create shift requirements
-        self.stdout.write("Creating shift requirements...")
-
-        # Requirement: Weekend shifts need urgent care specialty
-        ShiftRequirement.objects.get_or_create(
-            configuration=config,
-            applies_to='weekend',
-            required_specialty=uc_specialty,
-            defaults={
-                'min_with_specialty': 1,
-                'priority': 90,
-            }
-        )
+            gp_specialty, _ = Specialty.objects.get_or_create(
+                name='General Practice',
+                defaults={'description': 'Primary care and family medicine'}
+            )
+            uc_specialty, _ = Specialty.objects.get_or_create(
+                name='Urgent Care Physician',
+                defaults={'description': 'Blend of EM and GP for urgent care settings'}
+            )
+            self.stdout.write(self.style.SUCCESS(f"✓ Created 3 specialties"))
 
-        self.stdout.write(self.style.SUCCESS(f"✓ Created shift requirements"))
+            # Create doctors
+            self.stdout.write("Creating doctors...")
+            doctors_data = [
+                ('Dr. Sarah Johnson', 'sjohnson', [em_specialty, uc_specialty]),
+                ('Dr. Michael Chen', 'mchen', [gp_specialty, uc_specialty]),
+                ('Dr. Emily Rodriguez', 'erodriguez', [em_specialty]),
+                ('Dr. James Wilson', 'jwilson', [gp_specialty]),
+                ('Dr. Anna Kim', 'akim', [uc_specialty]),
+                ('Dr. David Brown', 'dbrown', [gp_specialty]),
+                ('Dr. Lisa Martinez', 'lmartinez', [em_specialty, uc_specialty]),
+                ('Dr. Robert Taylor', 'rtaylor', [uc_specialty]),
+                ('Dr. Jennifer Lee', 'jlee', [gp_specialty]),
+                ('Dr. Thomas Anderson', 'tanderson', [em_specialty]),
+            ]
 
-        # Create shifts for the month
-        self.stdout.write(f"Creating shifts for {year}-{month:02d}...")
+            # Hash the shared test password once rather than once per doctor
+            password_hash = make_password('password123')
+            new_doctors = []
+            for full_name, username, _ in doctors_data:
+                first_name, last_name = full_name.replace('Dr. ', '').rsplit(' ', 1)
+                new_doctors.append(Doctor(
+                    username=username,
+                    first_name=first_name,
+                    last_name=last_name,
+                    email=f'{username}@doctorsexpress.com',
+                    active=True,
+                    password=password_hash,
+                ))
 
-        # Get first and last day of month
-        first_day = date(year, month, 1)
-        if month == 12:
-            last_day = date(year, 12, 31)
-        else:
-            last_day = date(year, month + 1, 1) - timedelta(days=1)
+            # Existing usernames are skipped like get_or_create did; re-read the rows afterwards
+            # because skipped instances keep their unsaved client-side UUIDs
+            Doctor.objects.bulk_create(new_doctors, batch_size=500, ignore_conflicts=True)
+            doctors_by_username = Doctor.objects.in_bulk(
+                [username for _, username, _ in doctors_data], field_name='username'
+            )
+            doctors = [doctors_by_username[username] for _, username, _ in doctors_data]
+
+            # Replace every doctor's specialties (what .set() did per doctor) in one DELETE + INSERT
+            DoctorSpecialty = Doctor.specialties.through
+            DoctorSpecialty.objects.filter(doctor__in=doctors).delete()
+            DoctorSpecialty.objects.bulk_create([
+                DoctorSpecialty(doctor_id=doctor.id, specialty_id=specialty.id)
+                for doctor, (_, _, specialties) in zip(doctors, doctors_data)
+                for specialty in specialties
+            ], batch_size=500)
 
-        shift_count = 0
-        current_date = first_day
+            self.stdout.write(self.style.SUCCESS(f"✓ Created {len(doctors)} doctors"))
 
-        while current_date <= last_day:
-            # Create day shift
-            Shift.objects.get_or_create(
-                date=current_date,
-                shift_type='day',
+            # Create schedule configuration
+            self.stdout.write("Creating schedule configuration...")
+            config, created = ScheduleConfiguration.objects.get_or_create(
+                name='Default Configuration',
                 defaults={
-                    'start_time': '07:00:00',
-                    'end_time': '19:00:00',
-                    'min_doctors': 2,
+                    'description': 'Standard urgent care scheduling rules',
+                    'min_shifts_per_doctor': 14,
+                    'max_shifts_per_doctor': 16,
+                    'max_consecutive_shifts': 4,
+                    'min_rest_hours_between_shifts': 12,
+                    'max_consecutive_days_off': 5,
+                    'avoid_single_day_off': True,
+                    'default_min_doctors_per_shift': 2,
+                    'is_active': True,
                 }
             )
-            shift_count += 1
+            if created:
+                self.stdout.write(self.style.SUCCESS(f"✓ Created configuration: {config.name}"))
+            else:
+                self.stdout.write(f"  Using existing configuration: {config.name}")
+
+            # Create shift requirements
+            self.stdout.write("Creating shift requirements...")
 
-            # Create night shift
-            Shift.objects.get_or_create(
-                date=current_date,
-                shift_type='night',
+            # Requirement: Weekend shifts need urgent care specialty
+            ShiftRequirement.objects.get_or_create(
+                configuration=config,
+                applies_to=ShiftRequirement.AppliesTo.WEEKEND,
+                required_specialty=uc_specialty,
                 defaults={
-                    'start_time': '19:00:00',
-                    'end_time': '07:00:00',
-                    'min_doctors': 2,
+                    'min_with_specialty': 1,
+                    'priority': 90,
                 }
             )
-            shift_count += 1
 
-            current_date += timedelta(days=1)
+            self.stdout.write(self.style.SUCCESS(f"✓ Created shift requirements"))
 
-        self.stdout.write(self.style.SUCCESS(f"✓ Created {shift_count} shifts ({last_day.day} days × 2 shifts/day)"))
+            # Create shifts for the month
+            self.stdout.write(f"Creating shifts for {year}-{month:02d}...")
+
+            # Every date in the month
+            days_in_month = calendar.monthrange(year, month)[1]
+            month_dates = [date(year, month, day) for day in range(1, days_in_month + 1)]
+
+            shift_templates = (
+                (Shift.Type.DAY, '07:00:00', '19:00:00'),
+                (Shift.Type.NIGHT, '19:00:00', '07:00:00'),
+            )
+
+            shifts = [
+                Shift(
+                    date=shift_date,
+                    shift_type=shift_type,
+                    start_time=start_time,
+                    end_time=end_time,
+                    min_doctors=2,
+                )
+                for shift_date in month_dates
+                for shift_type, start_time, end_time in shift_templates
+            ]
+
+            self._insert_missing_shifts(shifts)
+            shift_count = len(shifts)
+
+            self.stdout.write(self.style.SUCCESS(f"✓ Created {shift_count} shifts ({days_in_month} days × 2 shifts/day)"))
 
         # Summary
         self.stdout.write("\n" + "=" * 60)
@@ -207,3 +227,66 @@ class Command(BaseCommand):
         self.stdout.write(f"     from scheduler.solver import generate_schedule")
         self.stdout.write(f"     solution = generate_schedule({month}, {year})")
         self.stdout.write("=" * 60 + "\n")
+
+    def _clear_test_data(self):
+        """
+        Remove all test data.
+
+        Schedules are removed as well: their assignments and violations point at the
+        doctors and shifts being cleared, so none of them would survive intact.
+
+        PostgreSQL empties every affected table with one TRUNCATE. The tables are named
+        explicitly instead of relying on CASCADE, so a new table referencing them makes
+        the TRUNCATE fail rather than be emptied silently. Other backends go through
+        the ORM's cascading delete, which removes the same rows.
+        """
+        if connection.vendor != 'postgresql':
+            for model in CLEARED_MODELS:
+                model.objects.all().delete()
+            return
+
+        tables = ', '.join(
+            connection.ops.quote_name(model._meta.db_table) for model in CLEARED_MODELS + DEPENDENT_MODELS
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE {tables} RESTART IDENTITY')
+
+    def _insert_missing_shifts(self, shifts):
+        """
+        Insert the shifts whose (date, shift_type) does not exist yet.
+
+        PostgreSQL loads them with a single COPY; other backends (SQLite in development)
+        fall back to bulk_create. Existing shifts are filtered out up front because COPY
+        has no ON CONFLICT clause.
+        """
+        existing = set(Shift.objects.filter(
+            date__range=(shifts[0].date, shifts[-1].date)
+        ).values_list('date', 'shift_type'))
+        new_shifts = [s for s in shifts if (s.date, s.shift_type) not in existing]
+
+        if not new_shifts:
+            return
+
+        if connection.vendor != 'postgresql':
+            Shift.objects.bulk_create(new_shifts, batch_size=500)
+            return
+
+        columns = ('id', 'date', 'shift_type', 'start_time', 'end_time', 'min_doctors', 'created_at')
+        created_at = timezone.now().isoformat()
+
+        # COPY is told to read CSV, so csv.writer's quoting is what the server expects
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        for shift in new_shifts:
+            writer.writerow((
+                shift.id, shift.date.isoformat(), shift.shift_type,
+                shift.start_time, shift.end_time, shift.min_doctors, created_at,
+            ))
+        buffer.seek(0)
+
+        sql = 'COPY {} ({}) FROM STDIN WITH (FORMAT csv)'.format(
+            connection.ops.quote_name(Shift._meta.db_table),
+            ', '.join(connection.ops.quote_name(column) for column in columns),
+        )
+        with connection.cursor() as cursor:
+            cursor.copy_expert(sql, buffer)
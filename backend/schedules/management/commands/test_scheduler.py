@@ -1,13 +1,18 @@
 """
 Django management command to test the scheduler.
+
+Only small samples are loaded here. Anything that walks every assignment or violation of a
+schedule should stream with .iterator(chunk_size=500) rather than materialize the queryset.
 """
 from django.core.management.base import BaseCommand
+from django.db.models import CharField, Prefetch, Value
+from django.db.models.functions import Concat
 from datetime import date
 
 from scheduler.solver import generate_schedule
-from scheduler.solution_parser import save_solution
+from scheduler.solution_parser import DEFAULT_BATCH_SIZE, save_solution
 from scheduler.data_preparation import SchedulerData
-from schedules.models import Schedule
+from schedules.models import Schedule, ShiftAssignment, ConstraintViolation
 
 
 class Command(BaseCommand):
@@ -32,6 +37,12 @@ class Command(BaseCommand):
             default=300,
             help='Solver timeout in seconds (default: 300)'
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Rows per INSERT when saving the solution (default: {DEFAULT_BATCH_SIZE})'
+        )
 
     def handle(self, *args, **options):
         # Determine month/year
@@ -69,7 +80,7 @@ class Command(BaseCommand):
 
             # Save to database
             self.stdout.write("\nSaving solution to database...")
-            schedule = save_solution(solution, data)
+            schedule, _ = save_solution(solution, data, batch_size=options['batch_size'])
 
             # Display results
             self.stdout.write("\n" + "=" * 60)
@@ -77,34 +88,61 @@ class Command(BaseCommand):
             self.stdout.write("=" * 60)
 
             if solution.is_feasible:
+                # Counts are stored on the schedule; both sample lists come from two prefetches
+                schedule = Schedule.objects.prefetch_related(
+                    Prefetch(
+                        'violations',
+                        queryset=ConstraintViolation.objects.select_related('doctor').order_by('-detected_at')[:10],
+                        to_attr='recent_violations',
+                    ),
+                    Prefetch(
+                        'assignments',
+                        # Only the doctor's name is shown, so build it in SQL instead of loading doctors
+                        queryset=ShiftAssignment.objects.select_related('shift').annotate(
+                            doctor_full_name=Concat(
+                                'doctor__first_name', Value(' '), 'doctor__last_name',
+                                output_field=CharField(),
+                            ),
+                        ).order_by('shift__date', 'shift__shift_type')[:10],
+                        to_attr='sample_assignments',
+                    ),
+                ).get(pk=schedule.pk)
+
                 self.stdout.write(self.style.SUCCESS(f"Status: {solution.status} ✓"))
                 self.stdout.write(f"Schedule ID: {schedule.id}")
                 self.stdout.write(f"Solver Time: {solution.solver_time:.2f} seconds")
                 self.stdout.write(f"Objective Value: {solution.objective_value}")
-                self.stdout.write(f"Assignments: {schedule.assignments.count()}")
-                self.stdout.write(f"Violations: {schedule.violations.count()}")
+                self.stdout.write(f"Assignments: {schedule.assignment_count}")
+                self.stdout.write(f"Violations: {schedule.violation_count}")
 
-                if schedule.violations.exists():
+                if schedule.violation_count:
                     self.stdout.write(self.style.WARNING("\n⚠️  Constraint Violations:"))
-                    for violation in schedule.violations.all()[:10]:
-                        self.stdout.write(f"  [{violation.severity}] {violation.violation_type}")
-                        self.stdout.write(f"    {violation.description}")
+                    # One write per listing rather than one per row
+                    self.stdout.write("\n".join(
+                        f"  [{violation.severity}] {violation.violation_type}\n"
+                        f"    {violation.description}"
+                        for violation in schedule.recent_violations
+                    ))
                 else:
                     self.stdout.write(self.style.SUCCESS("\n✓ No constraint violations"))
 
                 # Show sample assignments
                 self.stdout.write("\nSample Assignments (first 10):")
-                for assignment in schedule.assignments.all().select_related('doctor', 'shift')[:10]:
-                    self.stdout.write(
+                if schedule.sample_assignments:
+                    self.stdout.write("\n".join(
                         f"  {assignment.shift.date} {assignment.shift.shift_type}: "
-                        f"{assignment.doctor.get_full_name()}"
-                    )
+                        f"{assignment.doctor_full_name}"
+                        for assignment in schedule.sample_assignments
+                    ))
 
                 self.stdout.write("\nTo view full schedule:")
                 self.stdout.write(f"  python manage.py shell")
                 self.stdout.write(f"  >>> from schedules.models import Schedule")
                 self.stdout.write(f"  >>> schedule = Schedule.objects.get(id='{schedule.id}')")
-                self.stdout.write(f"  >>> for a in schedule.assignments.all(): print(a)")
+                self.stdout.write(
+                    "  >>> for a in schedule.assignments.select_related('doctor', 'shift')"
+                    ".iterator(chunk_size=500): print(a)"
+                )
 
             else:
                 self.stdout.write(self.style.ERROR(f"Status: {solution.status} ✗"))
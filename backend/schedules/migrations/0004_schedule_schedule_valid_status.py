@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-15 00:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0003_remove_shiftrequirement_min_junior_doctors_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='schedule',
+            constraint=models.CheckConstraint(check=models.Q(('status__in', ['draft', 'published', 'finalized'])), name='schedule_valid_status'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-15 01:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0004_schedule_schedule_valid_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='shiftassignment',
+            name='schedules_s_doctor__fda0f1_idx',
+        ),
+        migrations.AddIndex(
+            model_name='shiftassignment',
+            index=models.Index(fields=['doctor', 'shift'], name='sa_doctor_shift_idx'),
+        ),
+    ]
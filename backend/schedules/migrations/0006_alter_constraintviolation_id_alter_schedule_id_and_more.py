@@ -0,0 +1,34 @@
+# Generated by Django 5.0.1 on 2026-10-15 01:10
+
+import rota_scheduler.utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0005_remove_shiftassignment_schedules_s_doctor__fda0f1_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='constraintviolation',
+            name='id',
+            field=models.UUIDField(default=rota_scheduler.utils.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='schedule',
+            name='id',
+            field=models.UUIDField(default=rota_scheduler.utils.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='shift',
+            name='id',
+            field=models.UUIDField(default=rota_scheduler.utils.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='shiftassignment',
+            name='id',
+            field=models.UUIDField(default=rota_scheduler.utils.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
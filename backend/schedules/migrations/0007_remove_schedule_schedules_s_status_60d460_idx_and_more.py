@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-15 01:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0006_alter_constraintviolation_id_alter_schedule_id_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='schedule',
+            name='schedules_s_status_60d460_idx',
+        ),
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(condition=models.Q(('status__in', ['draft', 'published'])), fields=['status'], name='sched_status_active'),
+        ),
+    ]
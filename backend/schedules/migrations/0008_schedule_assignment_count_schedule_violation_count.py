@@ -0,0 +1,37 @@
+# Generated by Django 5.0.1 on 2026-10-15 01:14
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_counts(apps, schema_editor):
+    Schedule = apps.get_model('schedules', 'Schedule')
+    for schedule in Schedule.objects.annotate(
+        num_assignments=Count('assignments', distinct=True),
+        num_violations=Count('violations', distinct=True),
+    ).iterator():
+        Schedule.objects.filter(pk=schedule.pk).update(
+            assignment_count=schedule.num_assignments,
+            violation_count=schedule.num_violations,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0007_remove_schedule_schedules_s_status_60d460_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schedule',
+            name='assignment_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='schedule',
+            name='violation_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-15 01:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0008_schedule_assignment_count_schedule_violation_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='shiftassignment',
+            name='schedules_s_schedul_de353f_idx',
+        ),
+        migrations.AddIndex(
+            model_name='shiftassignment',
+            index=models.Index(fields=['schedule', 'doctor'], name='sa_sched_doc_idx'),
+        ),
+    ]
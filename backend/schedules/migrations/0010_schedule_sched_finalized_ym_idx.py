@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-15 01:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0009_remove_shiftassignment_schedules_s_schedul_de353f_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(condition=models.Q(('status', 'finalized')), fields=['year', 'month'], name='sched_finalized_ym_idx'),
+        ),
+    ]
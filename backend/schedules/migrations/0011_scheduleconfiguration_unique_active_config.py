@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-15 01:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0010_schedule_sched_finalized_ym_idx'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='scheduleconfiguration',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('is_active',), name='unique_active_config'),
+        ),
+    ]
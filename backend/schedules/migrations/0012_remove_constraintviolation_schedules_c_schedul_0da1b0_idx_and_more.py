@@ -0,0 +1,27 @@
+# Generated by Django 5.0.1 on 2026-10-15 01:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0011_scheduleconfiguration_unique_active_config'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='constraintviolation',
+            name='schedules_c_schedul_0da1b0_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='constraintviolation',
+            name='schedules_c_severit_ceae3b_idx',
+        ),
+        migrations.AddIndex(
+            model_name='constraintviolation',
+            index=models.Index(fields=['schedule', 'severity'], name='cv_sched_sev_idx'),
+        ),
+    ]
@@ -1,24 +1,51 @@
 import uuid
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db import models
+from django.db import models, transaction
+
+from rota_scheduler.utils import uuid7
+
+
+# Choice sets live at module level so model Meta constraints can reference them
+class ScheduleStatus(models.TextChoices):
+    DRAFT = 'draft', 'Draft'
+    PUBLISHED = 'published', 'Published'
+    FINALIZED = 'finalized', 'Finalized'
+
+
+class ShiftType(models.TextChoices):
+    DAY = 'day', 'Day Shift (7am-7pm)'
+    NIGHT = 'night', 'Night Shift (7pm-7am)'
+
+
+class AssignmentType(models.TextChoices):
+    SCHEDULED = 'scheduled', 'Scheduled'
+    MANUAL = 'manual', 'Manual'
+    SWAP = 'swap', 'Swap'
+    EXTRA = 'extra', 'Extra'
+
+
+class ViolationSeverity(models.TextChoices):
+    ERROR = 'error', 'Error'
+    WARNING = 'warning', 'Warning'
+    INFO = 'info', 'Info'
+
+
+class RequirementAppliesTo(models.TextChoices):
+    ALL = 'all', 'All Shifts'
+    DAY = 'day', 'Day Shifts Only'
+    NIGHT = 'night', 'Night Shifts Only'
+    WEEKDAY = 'weekday', 'Weekdays Only'
+    WEEKEND = 'weekend', 'Weekends Only'
 
 
 class Schedule(models.Model):
     """
     Monthly schedule for doctor shift assignments.
     """
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
-    # Status choices
-    STATUS_DRAFT = 'draft'
-    STATUS_PUBLISHED = 'published'
-    STATUS_FINALIZED = 'finalized'
-    STATUS_CHOICES = {
-        STATUS_DRAFT: 'Draft',
-        STATUS_PUBLISHED: 'Published',
-        STATUS_FINALIZED: 'Finalized',
-    }
+    Status = ScheduleStatus
 
     month = models.IntegerField(
         validators=[MinValueValidator(1), MaxValueValidator(12)]
@@ -26,8 +53,8 @@ class Schedule(models.Model):
     year = models.IntegerField(validators=[MinValueValidator(2024)])
     status = models.CharField(
         max_length=20,
-        choices=STATUS_CHOICES,
-        default=STATUS_DRAFT,
+        choices=Status.choices,
+        default=Status.DRAFT,
     )
     generated_at = models.DateTimeField(null=True, blank=True)
     generated_by = models.ForeignKey(
@@ -49,6 +76,11 @@ class Schedule(models.Model):
     objective_value = models.BigIntegerField(null=True, blank=True)
     notes = models.TextField(blank=True)
 
+    # Denormalized row counts, kept in sync by the solution parser so listings
+    # don't need a COUNT(*) per schedule
+    assignment_count = models.IntegerField(default=0)
+    violation_count = models.IntegerField(default=0)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -58,11 +90,26 @@ class Schedule(models.Model):
             models.UniqueConstraint(
                 fields=['month', 'year'],
                 name='unique_month_year'
-            )
+            ),
+            models.CheckConstraint(
+                check=models.Q(status__in=ScheduleStatus.values),
+                name='schedule_valid_status'
+            ),
         ]
         indexes = [
-            models.Index(fields=['status']),
+            # Finalized schedules accumulate but are rarely looked up by status
+            models.Index(
+                fields=['status'],
+                name='sched_status_active',
+                condition=models.Q(status__in=[ScheduleStatus.DRAFT, ScheduleStatus.PUBLISHED]),
+            ),
             models.Index(fields=['year', 'month']),
+            # Lets the task's "already finalized?" gate probe only finalized rows
+            models.Index(
+                fields=['year', 'month'],
+                name='sched_finalized_ym_idx',
+                condition=models.Q(status=ScheduleStatus.FINALIZED),
+            ),
         ]
 
     def __str__(self):
@@ -73,20 +120,14 @@ class Shift(models.Model):
     """
     Individual shifts (day or night) that doctors can be assigned to.
     """
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
-    # Shift type choices
-    SHIFT_DAY = 'day'
-    SHIFT_NIGHT = 'night'
-    SHIFT_TYPE_CHOICES = {
-        SHIFT_DAY: 'Day Shift (7am-7pm)',
-        SHIFT_NIGHT: 'Night Shift (7pm-7am)',
-    }
+    Type = ShiftType
 
     date = models.DateField()
     shift_type = models.CharField(
         max_length=10,
-        choices=SHIFT_TYPE_CHOICES,
+        choices=Type.choices,
     )
     start_time = models.TimeField(default='07:00:00')
     end_time = models.TimeField(default='19:00:00')
@@ -115,26 +156,16 @@ class Shift(models.Model):
     @property
     def is_day_shift(self):
         """Helper property to check if this is a day shift."""
-        return self.shift_type == self.SHIFT_DAY
+        return self.shift_type == self.Type.DAY
 
 
 class ShiftAssignment(models.Model):
     """
     Assignment of a doctor to a specific shift within a schedule.
     """
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
-    # Assignment type choices
-    TYPE_SCHEDULED = 'scheduled'
-    TYPE_MANUAL = 'manual'
-    TYPE_SWAP = 'swap'
-    TYPE_EXTRA = 'extra'
-    TYPE_CHOICES = {
-        TYPE_SCHEDULED: 'Scheduled',
-        TYPE_MANUAL: 'Manual',
-        TYPE_SWAP: 'Swap',
-        TYPE_EXTRA: 'Extra',
-    }
+    Type = AssignmentType
 
     schedule = models.ForeignKey(
         Schedule,
@@ -153,8 +184,8 @@ class ShiftAssignment(models.Model):
     )
     assignment_type = models.CharField(
         max_length=20,
-        choices=TYPE_CHOICES,
-        default=TYPE_SCHEDULED,
+        choices=Type.choices,
+        default=Type.SCHEDULED,
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -167,9 +198,11 @@ class ShiftAssignment(models.Model):
                 name='unique_schedule_shift_doctor'
             )
         ]
+        # schedule and (schedule, shift) lookups are served by the
+        # unique_schedule_shift_doctor index
         indexes = [
-            models.Index(fields=['schedule']),
-            models.Index(fields=['doctor']),
+            models.Index(fields=['schedule', 'doctor'], name='sa_sched_doc_idx'),
+            models.Index(fields=['doctor', 'shift'], name='sa_doctor_shift_idx'),
             models.Index(fields=['shift']),
         ]
 
@@ -181,17 +214,9 @@ class ConstraintViolation(models.Model):
     """
     Tracks constraint violations for auditing and reporting.
     """
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
-    # Severity choices
-    SEVERITY_ERROR = 'error'
-    SEVERITY_WARNING = 'warning'
-    SEVERITY_INFO = 'info'
-    SEVERITY_CHOICES = {
-        SEVERITY_ERROR: 'Error',
-        SEVERITY_WARNING: 'Warning',
-        SEVERITY_INFO: 'Info',
-    }
+    Severity = ViolationSeverity
 
     schedule = models.ForeignKey(
         Schedule,
@@ -208,16 +233,17 @@ class ConstraintViolation(models.Model):
     violation_type = models.CharField(max_length=50)
     severity = models.CharField(
         max_length=20,
-        choices=SEVERITY_CHOICES,
+        choices=Severity.choices,
     )
     description = models.TextField()
     detected_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['-detected_at']
+        # Violations are always read per schedule; the composite also serves
+        # schedule-only lookups as its prefix
         indexes = [
-            models.Index(fields=['schedule']),
-            models.Index(fields=['severity']),
+            models.Index(fields=['schedule', 'severity'], name='cv_sched_sev_idx'),
         ]
 
     def __str__(self):
@@ -280,15 +306,26 @@ class ScheduleConfiguration(models.Model):
 
     class Meta:
         ordering = ['-is_active', '-updated_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['is_active'],
+                condition=models.Q(is_active=True),
+                name='unique_active_config'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} {'(Active)' if self.is_active else ''}"
 
     def save(self, *args, **kwargs):
-        # Ensure only one active configuration
+        # Ensure only one active configuration; unique_active_config rejects a second
+        # active row, so switch the others off in the same transaction first
         if self.is_active:
-            ScheduleConfiguration.objects.filter(is_active=True).exclude(pk=self.pk).update(is_active=False)
-        super().save(*args, **kwargs)
+            with transaction.atomic():
+                ScheduleConfiguration.objects.filter(is_active=True).exclude(pk=self.pk).update(is_active=False)
+                super().save(*args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
 
 
 class ShiftRequirement(models.Model):
@@ -305,23 +342,12 @@ class ShiftRequirement(models.Model):
     )
 
     # When this requirement applies
-    APPLIES_TO_ALL = 'all'
-    APPLIES_TO_DAY = 'day'
-    APPLIES_TO_NIGHT = 'night'
-    APPLIES_TO_WEEKDAY = 'weekday'
-    APPLIES_TO_WEEKEND = 'weekend'
-    APPLIES_TO_CHOICES = {
-        APPLIES_TO_ALL: 'All Shifts',
-        APPLIES_TO_DAY: 'Day Shifts Only',
-        APPLIES_TO_NIGHT: 'Night Shifts Only',
-        APPLIES_TO_WEEKDAY: 'Weekdays Only',
-        APPLIES_TO_WEEKEND: 'Weekends Only',
-    }
+    AppliesTo = RequirementAppliesTo
 
     applies_to = models.CharField(
         max_length=20,
-        choices=APPLIES_TO_CHOICES,
-        default=APPLIES_TO_ALL
+        choices=AppliesTo.choices,
+        default=AppliesTo.ALL
     )
 
     # Specialty requirement
@@ -1,3 +1,697 @@
-from django.test import TestCase
+import csv
+import io
+import random
+import uuid
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.core.management import call_command
+from schedules.management.commands.setup_test_data import CLEARED_MODELS, DEPENDENT_MODELS, Command
+from django.db import IntegrityError, connection, transaction
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from doctors.models import Doctor
+from rota_scheduler.utils import uuid7
+from scheduler.data_preparation import SchedulerData
+from scheduler import solution_parser
+from scheduler.solution_parser import SolutionParser, save_solution
+from scheduler.solver import ScheduleSolution
+from tasks import schedule_generation
+from tasks.schedule_generation import (
+    RELAXATION_STEPS, generate_schedule_task, generate_schedule_with_retry, validate_schedule_task,
+)
+from .models import Schedule, Shift, ShiftAssignment, ScheduleConfiguration
+
+MONTH, YEAR = 3, 2026
+
+
+class UUID7Tests(SimpleTestCase):
+    """uuid7 sets the RFC 9562 version and variant bits and sorts by creation time."""
+
+    def test_version_and_variant(self):
+        for _ in range(100):
+            value = uuid7()
+            self.assertEqual(value.version, 7)
+            self.assertEqual(value.variant, uuid.RFC_4122)
+
+    def test_timestamp_prefix_is_unix_milliseconds(self):
+        with mock.patch('time.time_ns', return_value=1_767_225_600_123_456_789):
+            value = uuid7()
+
+        self.assertEqual(value.int >> 80, 1_767_225_600_123)
+
+    def test_later_milliseconds_sort_after_earlier_ones(self):
+        values = []
+        for ms in (1_000, 1_001, 1_002, 86_400_000):
+            with mock.patch('time.time_ns', return_value=ms * 1_000_000):
+                values.extend(uuid7() for _ in range(20))
+
+        self.assertEqual(
+            [value.int >> 80 for value in sorted(values)],
+            [value.int >> 80 for value in values],
+        )
+
+    def test_models_default_to_uuid7(self):
+        schedule = Schedule(month=MONTH, year=YEAR)
+        self.assertEqual(schedule.pk.version, 7)
+
+
+class ScheduleConfigurationActivationTests(TestCase):
+    """Saving a configuration as active switches the previously active one off."""
+
+    def setUp(self):
+        self.current = ScheduleConfiguration.objects.create(name='Current', is_active=True)
+
+    def updates(self, queries):
+        table = ScheduleConfiguration._meta.db_table
+        return [q['sql'] for q in queries.captured_queries if q['sql'].startswith(f'UPDATE "{table}"')]
+
+    def test_activating_a_new_configuration_deactivates_the_old_one(self):
+        replacement = ScheduleConfiguration.objects.create(name='Replacement', is_active=True)
+
+        self.current.refresh_from_db()
+        self.assertFalse(self.current.is_active)
+        self.assertEqual(list(ScheduleConfiguration.objects.filter(is_active=True)), [replacement])
+
+    def test_editing_the_active_configuration_keeps_it_active(self):
+        config = ScheduleConfiguration.objects.get(pk=self.current.pk)
+        config.max_consecutive_shifts = 5
+
+        config.save()
+
+        config.refresh_from_db()
+        self.assertTrue(config.is_active)
+        self.assertEqual(config.max_consecutive_shifts, 5)
+
+    def test_reactivating_a_loaded_configuration_switches_the_others_off(self):
+        config = ScheduleConfiguration.objects.get(pk=self.current.pk)
+        config.is_active = False
+        config.save()
+        other = ScheduleConfiguration.objects.create(name='Other', is_active=True)
+
+        config.is_active = True
+        config.save()
+
+        other.refresh_from_db()
+        self.assertFalse(other.is_active)
+        self.assertEqual(ScheduleConfiguration.objects.filter(is_active=True).get(), config)
+
+    def test_refreshed_configuration_can_be_reactivated(self):
+        ScheduleConfiguration.objects.create(name='Other', is_active=True)
+        self.current.refresh_from_db()
+        self.assertFalse(self.current.is_active)
+
+        self.current.is_active = True
+        self.current.save()
+
+        self.assertEqual(ScheduleConfiguration.objects.filter(is_active=True).get(), self.current)
+
+    def test_instance_switched_off_by_another_activation_can_be_reactivated(self):
+        # self.current still holds is_active=True in memory after the other save
+        ScheduleConfiguration.objects.create(name='Other', is_active=True)
+
+        self.current.save()
+
+        self.assertEqual(ScheduleConfiguration.objects.filter(is_active=True).get(), self.current)
+
+    def test_saving_an_inactive_configuration_leaves_the_active_one(self):
+        with CaptureQueriesContext(connection) as queries:
+            ScheduleConfiguration.objects.create(name='Draft')
+
+        self.assertEqual(self.updates(queries), [])
+        self.assertTrue(ScheduleConfiguration.objects.get(pk=self.current.pk).is_active)
+
+    def test_database_rejects_a_second_active_configuration(self):
+        ScheduleConfiguration.objects.create(name='Draft')
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ScheduleConfiguration.objects.filter(name='Draft').update(is_active=True)
+
+
+class SchedulingFixtureMixin:
+    """
+    A small month to schedule: three doctors and day/night shifts for 1-7 March.
+
+    SchedulerData orders shifts by (date, shift_type), so index 2k is the day shift
+    and 2k + 1 the night shift of day k + 1.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.configuration = ScheduleConfiguration.objects.create(
+            name='Test', is_active=True, max_consecutive_shifts=3,
+        )
+        cls.doctors = [
+            Doctor.objects.create(username=f'doctor{i}', first_name='Doctor', last_name=str(i))
+            for i in range(3)
+        ]
+        Shift.objects.bulk_create([
+            Shift(date=date(YEAR, MONTH, day), shift_type=shift_type, min_doctors=1)
+            for day in range(1, 8)
+            for shift_type in (Shift.Type.DAY, Shift.Type.NIGHT)
+        ])
+
+    def load_data(self, **config_fields):
+        for field, value in config_fields.items():
+            setattr(self.configuration, field, value)
+        return SchedulerData(MONTH, YEAR, configuration=self.configuration)
+
+    def assign(self, schedule, data, doctor_idx, shift_indices):
+        ShiftAssignment.objects.bulk_create([
+            ShiftAssignment(
+                schedule=schedule,
+                doctor_id=data.doctor_ids[doctor_idx],
+                shift_id=data.shift_ids[shift_idx],
+            )
+            for shift_idx in shift_indices
+        ])
+
+
+def old_consecutive_violation(shift_indices, max_consecutive):
+    """The loop the vectorized consecutive check replaced; returns the reported run length."""
+    consecutive_count = 1
+    for i in range(1, len(shift_indices)):
+        if shift_indices[i] == shift_indices[i - 1] + 1:
+            consecutive_count += 1
+            if consecutive_count > max_consecutive:
+                return consecutive_count
+        else:
+            consecutive_count = 1
+    return None
+
+
+def old_rest_violations(shifts):
+    """The loop the vectorized rest check replaced; returns (night date, day date) pairs."""
+    return [
+        (current.date, following.date)
+        for current, following in zip(shifts, shifts[1:])
+        if current.shift_type == Shift.Type.NIGHT
+        and following.shift_type == Shift.Type.DAY
+        and (following.date - current.date).days <= 1
+    ]
+
+
+class ViolationDetectionTests(SchedulingFixtureMixin, TestCase):
+    """The vectorized consecutive-shift and rest-period checks on fixed assignment sets."""
+
+    def setUp(self):
+        self.schedule = Schedule.objects.create(month=MONTH, year=YEAR)
+
+    def detect(self, data, assignments_by_doctor):
+        for doctor_idx, shift_indices in assignments_by_doctor.items():
+            self.assign(self.schedule, data, doctor_idx, shift_indices)
+        parser = SolutionParser(None, data)
+        parser._detect_violations(self.schedule)
+        return parser.violations
+
+    def of_type(self, violations, violation_type):
+        return [v for v in violations if v.violation_type == violation_type]
+
+    def test_consecutive_run_over_the_limit_is_reported_once(self):
+        data = self.load_data(max_consecutive_shifts=3)
+
+        violations = self.of_type(
+            self.detect(data, {0: [0, 1, 2, 3, 4, 5], 1: [0, 1, 2], 2: [0, 1, 2, 4, 5, 6]}),
+            'too_many_consecutive_shifts',
+        )
+
+        self.assertEqual([v.doctor_id for v in violations], [data.doctor_ids[0]])
+        self.assertEqual(
+            violations[0].description,
+            "Doctor Doctor 0 has 4 consecutive shifts (maximum: 3)",
+        )
+
+    def test_consecutive_limit_of_one_flags_any_adjacent_pair(self):
+        data = self.load_data(max_consecutive_shifts=1)
+
+        violations = self.of_type(
+            self.detect(data, {0: [0, 2, 4], 1: [5, 6]}),
+            'too_many_consecutive_shifts',
+        )
+
+        self.assertEqual([v.doctor_id for v in violations], [data.doctor_ids[1]])
+
+    def test_consecutive_limit_of_zero_flags_every_working_doctor(self):
+        # MinValueValidator(1) is bypassed by update(); the check must not break on it
+        data = self.load_data(max_consecutive_shifts=0)
+
+        violations = self.of_type(
+            self.detect(data, {0: [0], 1: [3, 9]}),
+            'too_many_consecutive_shifts',
+        )
+
+        self.assertEqual(
+            sorted(v.doctor_id for v in violations),
+            sorted([data.doctor_ids[0], data.doctor_ids[1]]),
+        )
+        self.assertIn("has 1 consecutive shifts (maximum: 0)", violations[0].description)
+
+    def test_consecutive_check_matches_the_old_loop(self):
+        rng = random.Random(7)
+        for max_consecutive in (1, 2, 3, 5):
+            data = self.load_data(max_consecutive_shifts=max_consecutive)
+            assignments = {
+                doctor_idx: sorted(rng.sample(range(data.num_shifts), rng.randint(1, 10)))
+                for doctor_idx in range(3)
+            }
+            ShiftAssignment.objects.filter(schedule=self.schedule).delete()
+
+            violations = self.of_type(self.detect(data, assignments), 'too_many_consecutive_shifts')
+
+            expected = {
+                data.doctor_ids[doctor_idx]: run
+                for doctor_idx, indices in assignments.items()
+                if (run := old_consecutive_violation(indices, max_consecutive)) is not None
+            }
+            self.assertEqual({v.doctor_id for v in violations}, set(expected), assignments)
+            for v in violations:
+                self.assertIn(f"has {expected[v.doctor_id]} consecutive", v.description)
+
+    def test_night_followed_by_next_day_is_a_rest_violation(self):
+        data = self.load_data(min_rest_hours_between_shifts=12)
+
+        # Doctor 0: night 1st -> day 2nd (violation), night 3rd -> day 5th (gap, fine)
+        # Doctor 1: day shifts only; doctor 2: night 6th -> night 7th
+        violations = self.of_type(
+            self.detect(data, {0: [1, 2, 5, 8], 1: [0, 2, 4], 2: [11, 13]}),
+            'insufficient_rest',
+        )
+
+        self.assertEqual([v.doctor_id for v in violations], [data.doctor_ids[0]])
+        self.assertEqual(
+            violations[0].description,
+            "Doctor Doctor 0 has night shift on 2026-03-01 followed by day shift on "
+            "2026-03-02 (less than 12 hours rest)",
+        )
+
+    def test_rest_check_is_skipped_below_twelve_hours(self):
+        data = self.load_data(min_rest_hours_between_shifts=8)
+
+        violations = self.detect(data, {0: [1, 2]})
+
+        self.assertEqual(self.of_type(violations, 'insufficient_rest'), [])
+
+    def test_rest_check_matches_the_old_loop(self):
+        rng = random.Random(11)
+        data = self.load_data(min_rest_hours_between_shifts=12)
+        for _ in range(5):
+            assignments = {
+                doctor_idx: sorted(rng.sample(range(data.num_shifts), rng.randint(2, 9)))
+                for doctor_idx in range(3)
+            }
+            ShiftAssignment.objects.filter(schedule=self.schedule).delete()
+
+            violations = self.of_type(self.detect(data, assignments), 'insufficient_rest')
+
+            expected = sorted(
+                (data.doctor_ids[doctor_idx], night, day)
+                for doctor_idx, indices in assignments.items()
+                for night, day in old_rest_violations([data.shifts[i] for i in indices])
+            )
+            actual = sorted(
+                (v.doctor_id, *(date.fromisoformat(part.split()[0]) for part in
+                                v.description.split(' shift on ')[1:]))
+                for v in violations
+            )
+            self.assertEqual(actual, expected, assignments)
+
+
+class SaveSolutionTests(SchedulingFixtureMixin, TestCase):
+    """Saving a solution writes assignments in batch_size pages and upserts on regeneration."""
+
+    def save(self, assignments, **kwargs):
+        data = self.load_data()
+        solution = ScheduleSolution('FEASIBLE', assignments, solver_time=0, objective_value=len(assignments))
+        return save_solution(solution, data, **kwargs)
+
+    def test_assignments_are_inserted_in_batch_size_pages(self):
+        assignments = [(doctor_idx, shift_idx) for doctor_idx in range(3) for shift_idx in range(4)]
+        table = ShiftAssignment._meta.db_table
+
+        with CaptureQueriesContext(connection) as queries:
+            schedule, _ = self.save(assignments, batch_size=5)
+
+        inserts = [q['sql'] for q in queries.captured_queries if q['sql'].startswith(f'INSERT INTO "{table}"')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(schedule.assignments.count(), 12)
+        self.assertEqual(Schedule.objects.get(pk=schedule.pk).assignment_count, 12)
+
+    def test_postgresql_upserts_large_solutions_with_execute_values(self):
+        calls = []
+        for patcher in (
+            mock.patch.object(connection, 'vendor', 'postgresql'),
+            mock.patch.object(solution_parser, 'FAST_INSERT_THRESHOLD', 5),
+            mock.patch('psycopg2.extras.execute_values', lambda cursor, sql, rows, page_size: calls.append(
+                (sql, rows, page_size)
+            )),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        assignments = [(doctor_idx, shift_idx) for doctor_idx in range(2) for shift_idx in range(4)]
+
+        schedule, _ = self.save(assignments, batch_size=3)
+
+        [(sql, rows, page_size)] = calls
+        self.assertEqual(
+            sql,
+            'INSERT INTO "schedules_shiftassignment" '
+            '(id, schedule_id, shift_id, doctor_id, assignment_type, created_at, updated_at) '
+            'VALUES %s '
+            'ON CONFLICT (schedule_id, shift_id, doctor_id) DO UPDATE SET '
+            'assignment_type = EXCLUDED.assignment_type, updated_at = EXCLUDED.updated_at',
+        )
+        self.assertEqual(page_size, 3)
+        data = self.load_data()
+        self.assertEqual(
+            [row[1:5] for row in rows],
+            [
+                (schedule.pk, data.shift_ids[shift_idx], data.doctor_ids[doctor_idx], 'scheduled')
+                for doctor_idx, shift_idx in assignments
+            ],
+        )
+        for row in rows:
+            self.assertEqual(row[0].version, 7)
+            self.assertEqual(row[5], row[6])
+
+    def test_regeneration_keeps_unchanged_rows_and_deletes_stale_ones(self):
+        schedule, _ = self.save([(0, 0), (0, 1), (1, 2), (2, 3)])
+        before = {
+            (a.doctor_id, a.shift_id): a
+            for a in ShiftAssignment.objects.filter(schedule=schedule)
+        }
+        past = timezone.now() - timedelta(days=1)
+        ShiftAssignment.objects.filter(schedule=schedule).update(
+            assignment_type=ShiftAssignment.Type.MANUAL, updated_at=past,
+        )
+
+        data = self.load_data()
+        self.save([(0, 0), (1, 2), (1, 4)])
+
+        after = {
+            (a.doctor_id, a.shift_id): a
+            for a in ShiftAssignment.objects.filter(schedule=schedule)
+        }
+        kept = [(data.doctor_ids[0], data.shift_ids[0]), (data.doctor_ids[1], data.shift_ids[2])]
+        added = (data.doctor_ids[1], data.shift_ids[4])
+        self.assertEqual(set(after), {*kept, added})
+        for pair in kept:
+            self.assertEqual(after[pair].pk, before[pair].pk)
+            self.assertEqual(after[pair].created_at, before[pair].created_at)
+            self.assertEqual(after[pair].assignment_type, ShiftAssignment.Type.SCHEDULED)
+            self.assertGreater(after[pair].updated_at, past)
+
+    def test_stale_assignments_are_removed_with_one_delete(self):
+        schedule, _ = self.save([(0, 0), (0, 1), (1, 2), (2, 3)])
+        table = ShiftAssignment._meta.db_table
+
+        with CaptureQueriesContext(connection) as queries:
+            self.save([(0, 0), (2, 5)])
+
+        statements = [q['sql'] for q in queries.captured_queries if f'"{table}"' in q['sql']]
+        self.assertTrue(statements[0].startswith(f'DELETE FROM "{table}"'), statements[0])
+        self.assertTrue(statements[1].startswith(f'INSERT INTO "{table}"'), statements[1])
+        self.assertEqual(sum(sql.startswith('DELETE') for sql in statements), 1)
+        self.assertEqual(schedule.assignments.count(), 2)
+
+    def test_empty_solution_clears_the_schedule(self):
+        schedule, _ = self.save([(0, 0), (1, 2)])
+
+        self.save([])
+
+        self.assertFalse(schedule.assignments.exists())
+
+
+class FakeSolver:
+    """
+    Stands in for ScheduleSolver: records the configuration each attempt sees and
+    is feasible only once single days off are allowed.
+
+    The feasible solution gives doctor 0 the first four shifts, one over the
+    fixture's max_consecutive_shifts of 3.
+    """
+
+    def __init__(self, data, timeout_seconds=300):
+        self.data = data
+        self.seen.append({
+            'max_consecutive_shifts': data.configuration.max_consecutive_shifts,
+            'avoid_single_day_off': data.configuration.avoid_single_day_off,
+        })
+
+    def solve(self):
+        if self.data.configuration.avoid_single_day_off:
+            return ScheduleSolution('INFEASIBLE', [], solver_time=0)
+        return ScheduleSolution('FEASIBLE', [(0, i) for i in range(4)], solver_time=0)
+
+
+class GenerateWithRetryTests(SchedulingFixtureMixin, TestCase):
+    """generate_schedule_with_retry relaxes the solver's rules, never the validation's."""
+
+    def setUp(self):
+        FakeSolver.seen = []
+        patcher = mock.patch.object(schedule_generation, 'ScheduleSolver', FakeSolver)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_relaxation_steps_are_tried_in_order(self):
+        result = generate_schedule_with_retry(MONTH, YEAR)
+
+        self.assertEqual(result['status'], 'SUCCESS')
+        self.assertEqual(result['relaxed_constraints'], RELAXATION_STEPS[1])
+        self.assertEqual(FakeSolver.seen, [
+            {'max_consecutive_shifts': 3, 'avoid_single_day_off': True},
+            {'max_consecutive_shifts': 5, 'avoid_single_day_off': True},
+            {'max_consecutive_shifts': 5, 'avoid_single_day_off': False},
+        ])
+
+    def test_relaxation_never_lowers_a_looser_limit(self):
+        ScheduleConfiguration.objects.filter(pk=self.configuration.pk).update(max_consecutive_shifts=8)
+
+        generate_schedule_with_retry(MONTH, YEAR)
+
+        self.assertEqual([seen['max_consecutive_shifts'] for seen in FakeSolver.seen], [8, 8, 8])
+
+    def test_violations_are_detected_against_the_configured_rules(self):
+        result = generate_schedule_with_retry(MONTH, YEAR)
+
+        consecutive = [v for v in result['violations'] if v['type'] == 'too_many_consecutive_shifts']
+        self.assertEqual(
+            [v['description'] for v in consecutive],
+            ["Doctor Doctor 0 has 4 consecutive shifts (maximum: 3)"],
+        )
+
+    def test_overrides_do_not_reach_the_shared_data(self):
+        loaded = []
+
+        def load(month, year):
+            data = SchedulerData(month, year)
+            loaded.append(data)
+            return data
+
+        with mock.patch.object(schedule_generation, 'SchedulerData', side_effect=load):
+            generate_schedule_with_retry(MONTH, YEAR)
+
+        self.assertEqual(len(loaded), 1)
+        self.assertEqual(loaded[0].configuration.max_consecutive_shifts, 3)
+        self.assertTrue(loaded[0].configuration.avoid_single_day_off)
+
+    def test_max_retries_limits_the_relaxation_steps(self):
+        result = generate_schedule_with_retry(MONTH, YEAR, max_retries=1)
+
+        self.assertEqual(result['status'], 'INFEASIBLE')
+        self.assertEqual(result['relaxed_constraints'], RELAXATION_STEPS[0])
+        self.assertEqual(len(FakeSolver.seen), 2)
+
+    def test_feasible_first_attempt_is_not_relaxed(self):
+        ScheduleConfiguration.objects.filter(pk=self.configuration.pk).update(avoid_single_day_off=False)
+
+        result = generate_schedule_with_retry(MONTH, YEAR)
+
+        self.assertEqual(result['status'], 'SUCCESS')
+        self.assertNotIn('relaxed_constraints', result)
+        self.assertEqual(len(FakeSolver.seen), 1)
+
+
+class GenerateScheduleTests(SchedulingFixtureMixin, TestCase):
+    """generate_schedule_task checks the initiating user before solving."""
+
+    def setUp(self):
+        FakeSolver.seen = []
+
+    def test_unknown_user_is_dropped_before_solving(self):
+        user_id = uuid.uuid4()
+        with mock.patch.object(schedule_generation, 'ScheduleSolver', FakeSolver), \
+                self.assertLogs('tasks.schedule_generation', 'WARNING') as logs:
+            result = generate_schedule_task(MONTH, YEAR, user_id=user_id)
+
+        self.assertIn(f"[Task None] User {user_id} not found", logs.output[0])
+        self.assertEqual(result['status'], 'INFEASIBLE')
+        self.assertIsNone(Schedule.objects.get(pk=result['schedule_id']).generated_by_id)
+
+    def test_known_user_is_recorded(self):
+        doctor = self.doctors[0]
+        with mock.patch.object(schedule_generation, 'ScheduleSolver', FakeSolver):
+            result = generate_schedule_task(MONTH, YEAR, user_id=doctor.pk)
+
+        self.assertEqual(Schedule.objects.get(pk=result['schedule_id']).generated_by_id, doctor.pk)
+
+
+class ValidateScheduleTests(SchedulingFixtureMixin, TestCase):
+    """validate_schedule_task refreshes the stored counts after manual edits."""
+
+    def test_counts_follow_manual_assignment_changes(self):
+        data = self.load_data()
+        solution = ScheduleSolution('FEASIBLE', [(0, 0), (1, 2), (2, 4)], solver_time=0, objective_value=3)
+        schedule, _ = save_solution(solution, data)
+        ShiftAssignment.objects.filter(schedule=schedule, doctor_id=data.doctor_ids[2]).delete()
+        self.assign(schedule, data, 0, [1, 2, 3, 4])
+
+        result = validate_schedule_task(str(schedule.pk))
+
+        schedule.refresh_from_db()
+        self.assertEqual(schedule.assignment_count, 6)
+        self.assertEqual(schedule.violation_count, result['violation_count'])
+        self.assertEqual(schedule.violation_count, schedule.violations.count())
+
+
+class RecordingCursor:
+    """
+    Wraps a real cursor, recording the PostgreSQL-only statements instead of running them.
+
+    Lets the PostgreSQL branches of setup_test_data be checked on SQLite; every other
+    statement goes through to the database.
+    """
+
+    def __init__(self, cursor, calls):
+        self.cursor = cursor
+        self.calls = calls
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cursor.close()
+
+    def execute(self, sql, params=None):
+        if sql.startswith('TRUNCATE'):
+            self.calls.append((sql, None))
+            return None
+        return self.cursor.execute(sql, params)
+
+    def copy_expert(self, sql, file):
+        self.calls.append((sql, file.read()))
+
+
+class SetupTestDataTests(TestCase):
+    """setup_test_data is re-runnable and its PostgreSQL fast paths emit valid statements."""
+
+    def run_command(self, *args):
+        call_command('setup_test_data', '--month', str(MONTH), '--year', str(YEAR), *args, stdout=io.StringIO())
+
+    def postgresql(self):
+        """Patch the connection to take the PostgreSQL branches; returns the recorded calls."""
+        calls = []
+        real_cursor = connection.cursor
+        for patcher in (
+            mock.patch.object(connection, 'vendor', 'postgresql'),
+            mock.patch.object(connection, 'cursor', lambda: RecordingCursor(real_cursor(), calls)),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        return calls
+
+    def test_creates_the_month(self):
+        self.run_command()
+
+        self.assertEqual(Doctor.objects.filter(active=True).count(), 10)
+        self.assertEqual(Shift.objects.filter(date__year=YEAR, date__month=MONTH).count(), 62)
+        self.assertEqual(ScheduleConfiguration.objects.filter(is_active=True).count(), 1)
+
+    def test_rerun_only_inserts_missing_shifts(self):
+        self.run_command()
+        kept_ids = set(Shift.objects.exclude(date=date(YEAR, MONTH, 15)).values_list('id', flat=True))
+        Shift.objects.filter(date=date(YEAR, MONTH, 15)).delete()
+
+        self.run_command()
+
+        shifts = Shift.objects.filter(date__year=YEAR, date__month=MONTH)
+        self.assertEqual(shifts.count(), 62)
+        self.assertTrue(kept_ids <= set(shifts.values_list('id', flat=True)))
+        self.assertEqual(Doctor.objects.count(), 10)
+
+    def test_postgresql_copies_missing_shifts_as_csv(self):
+        self.run_command()
+        Shift.objects.filter(date=date(YEAR, MONTH, 15)).delete()
+        calls = self.postgresql()
+
+        self.run_command()
+
+        [(sql, payload)] = calls
+        self.assertEqual(
+            sql,
+            'COPY "schedules_shift" ("id", "date", "shift_type", "start_time", "end_time", '
+            '"min_doctors", "created_at") FROM STDIN WITH (FORMAT csv)',
+        )
+        rows = list(csv.reader(io.StringIO(payload)))
+        self.assertEqual(
+            [row[1:6] for row in rows],
+            [
+                ['2026-03-15', 'day', '07:00:00', '19:00:00', '2'],
+                ['2026-03-15', 'night', '19:00:00', '07:00:00', '2'],
+            ],
+        )
+        for row in rows:
+            self.assertEqual(uuid.UUID(row[0]).version, 7)
+
+    def test_clear_removes_test_data_and_dependent_rows(self):
+        self.run_command()
+        old_shift_ids = set(Shift.objects.values_list('id', flat=True))
+        old_doctor_ids = set(Doctor.objects.values_list('id', flat=True))
+        schedule = Schedule.objects.create(month=MONTH, year=YEAR)
+        ShiftAssignment.objects.create(
+            schedule=schedule, shift=Shift.objects.first(), doctor=Doctor.objects.first(),
+        )
+
+        self.run_command('--clear')
+
+        self.assertFalse(Schedule.objects.exists())
+        self.assertFalse(ShiftAssignment.objects.exists())
+        self.assertFalse(Shift.objects.filter(id__in=old_shift_ids).exists())
+        self.assertFalse(Doctor.objects.filter(id__in=old_doctor_ids).exists())
+        self.assertEqual(Doctor.objects.count(), 10)
+        self.assertEqual(ScheduleConfiguration.objects.count(), 1)
+
+    def test_postgresql_clears_with_one_truncate(self):
+        self.run_command()
+        calls = self.postgresql()
+
+        with CaptureQueriesContext(connection) as queries:
+            Command()._clear_test_data()
+
+        self.assertEqual(calls, [(
+            'TRUNCATE "schedules_schedule", "schedules_shiftrequirement", '
+            '"schedules_scheduleconfiguration", "schedules_shift", "doctors_doctor", '
+            '"doctors_specialty", "schedules_shiftassignment", "schedules_constraintviolation", '
+            '"requests_leaverequest", "requests_shiftrequest", "requests_shiftswap", '
+            '"django_admin_log", "doctors_doctor_specialties", "doctors_doctor_groups", '
+            '"doctors_doctor_user_permissions" RESTART IDENTITY',
+            None,
+        )])
+        self.assertFalse(any(q['sql'].startswith('DELETE') for q in queries.captured_queries))
+
+    def test_truncate_names_every_table_referencing_a_cleared_one(self):
+        # Without CASCADE, PostgreSQL refuses to TRUNCATE a table that an unlisted table
+        # has a foreign key to, whatever the rows contain
+        truncated = set(CLEARED_MODELS + DEPENDENT_MODELS)
+        referencing = {
+            model
+            for model in apps.get_models(include_auto_created=True)
+            for field in model._meta.concrete_fields
+            if field.many_to_one and field.related_model in truncated
+        }
+        self.assertLessEqual(referencing, truncated)
@@ -3,6 +3,7 @@ Celery task for asynchronous schedule generation.
 """
 from celery import shared_task
 from django.utils import timezone
+import copy
 import logging
 
 from scheduler.data_preparation import SchedulerData
@@ -12,116 +13,188 @@ from schedules.models import Schedule
 
 logger = logging.getLogger(__name__)
 
+# Configuration overrides tried in order when a schedule comes back infeasible.
+# Integer limits are raised to at least the given value, never lowered
+RELAXATION_STEPS = [
+    {'max_consecutive_shifts': 5},
+    {'max_consecutive_shifts': 5, 'avoid_single_day_off': False},
+]
 
-@shared_task(bind=True, name='tasks.generate_schedule')
-def generate_schedule_task(self, month: int, year: int, user_id=None, timeout_seconds: int = 300):
+
+def _relaxed_data(data: SchedulerData, config_overrides: dict) -> SchedulerData:
     """
-    Asynchronous Celery task for generating a monthly schedule.
+    Return a view of data whose configuration carries the relaxed overrides.
+
+    The copies are shallow: doctors, shifts and masks are shared, but the
+    configuration is a separate instance so the overrides never reach the
+    original data that later attempts and violation detection use.
+    """
+    configuration = copy.copy(data.configuration)
+    for field, value in config_overrides.items():
+        current = getattr(configuration, field)
+        if isinstance(value, int) and not isinstance(value, bool):
+            value = max(current, value)
+        setattr(configuration, field, value)
+
+    relaxed = copy.copy(data)
+    relaxed.configuration = configuration
+    return relaxed
+
+
+def _run_solve(data: SchedulerData, timeout_seconds: int, generated_by_id=None,
+               config_overrides: dict = None, progress=None):
+    """
+    Solve and save a schedule from already-loaded data.
+
+    Taking SchedulerData rather than month/year lets retries reuse one load.
+
+    Args:
+        data: SchedulerData for the month being generated
+        timeout_seconds: Maximum solver time in seconds
+        generated_by_id: ID of the doctor who initiated generation (optional)
+        config_overrides: Configuration fields to relax; only the solver sees them,
+            violations are still detected against the configured rules
+        progress: Optional callable(step, description) for progress reporting
+
+    Returns:
+        tuple: (ScheduleSolution, Schedule, list of saved ConstraintViolations)
+    """
+    solver_data = _relaxed_data(data, config_overrides) if config_overrides else data
+
+    if progress:
+        progress('building_model',
+                 f'Building constraint model ({len(data.doctors)} × {len(data.shifts)} variables)...')
+
+    solver = ScheduleSolver(solver_data, timeout_seconds)
+    solution = solver.solve()
+
+    if progress:
+        progress('saving_solution', f'Saving {len(solution.assignments)} assignments to database...')
+
+    schedule, violations = save_solution(solution, data, generated_by_id)
+    return solution, schedule, violations
+
+
+def _existing_user_id(user_id, task_id=None):
+    """
+    Return user_id if the Doctor exists, else None.
+
+    generated_by is a deferred foreign key, so a stale id would only fail when the
+    save commits, after the whole solve; an EXISTS query up front is cheaper.
+    """
+    if not user_id:
+        return None
+    from doctors.models import Doctor
+    if not Doctor.objects.filter(pk=user_id).exists():
+        logger.warning(f"[Task {task_id}] User {user_id} not found - saving without generated_by")
+        return None
+    return user_id
+
+
+def _serialize_violations(violations) -> list:
+    """Violation summaries for a task result, built from in-memory rows."""
+    return [
+        {
+            'type': v.violation_type,
+            'severity': v.severity,
+            'description': v.description
+        }
+        for v in violations
+    ]
+
+
+def _build_result(solution, schedule, violations) -> dict:
+    """Summarise a saved solution for the task result."""
+    result = {
+        'status': 'SUCCESS' if solution.is_feasible else 'INFEASIBLE',
+        'schedule_id': str(schedule.id),
+        'solver_status': solution.status,
+        'solver_time': solution.solver_time,
+        'assignment_count': len(solution.assignments),
+        'objective_value': solution.objective_value,
+        'violation_count': len(violations),
+        'violations': _serialize_violations(violations),
+        'generated_at': timezone.now().isoformat(),
+    }
+    if not solution.is_feasible:
+        result['error'] = 'No feasible solution found - constraints may be too restrictive'
+    return result
+
+
+def _generate_schedule(month: int, year: int, user_id=None, timeout_seconds: int = 300,
+                       data: SchedulerData = None, config_overrides: dict = None,
+                       progress=None, task_id=None) -> dict:
+    """
+    Generate and save a monthly schedule, returning the task result summary.
+
+    This is the body of generate_schedule_task as a plain function so the
+    retry orchestrator can call it in-process, without a Celery round trip.
 
     Args:
         month: Month to generate schedule for (1-12)
         year: Year to generate schedule for
         user_id: ID of user who initiated generation (optional)
-        timeout_seconds: Maximum solver time in seconds (default: 300 = 5 minutes)
+        timeout_seconds: Maximum solver time in seconds
+        data: Preloaded SchedulerData to reuse (loaded here if omitted)
+        config_overrides: Configuration fields to relax for this attempt
+        progress: Optional callable(step, description) for progress reporting
+        task_id: Celery task id, used to tag log messages
 
     Returns:
         dict: Result summary with status, schedule_id, and statistics
     """
-    task_id = self.request.id
-    logger.info(f"[Task {task_id}] Starting schedule generation for {year}-{month:02d}")
-
     try:
-        # Update task state to show progress
-        self.update_state(
-            state='PROGRESS',
-            meta={'step': 'loading_data', 'description': 'Loading doctors, shifts, and constraints...'}
-        )
-
-        # Load data
-        logger.info(f"[Task {task_id}] Loading data...")
-        data = SchedulerData(month, year)
-        logger.info(f"[Task {task_id}] Loaded {len(data.doctors)} doctors, {len(data.shifts)} shifts")
-
-        # Check for existing schedule
-        schedule = Schedule.objects.filter(month=month, year=year).first()
-        if schedule and schedule.status == Schedule.STATUS_FINALIZED:
+        if data is None:
+            # Update task state to show progress
+            if progress:
+                progress('loading_data', 'Loading doctors, shifts, and constraints...')
+
+            # Load data
+            logger.info(f"[Task {task_id}] Loading data...")
+            data = SchedulerData(month, year)
+            logger.info(f"[Task {task_id}] Loaded {len(data.doctors)} doctors, {len(data.shifts)} shifts")
+
+        # Check for an existing finalized schedule (only its id is needed)
+        finalized_id = Schedule.objects.filter(
+            month=month, year=year, status=Schedule.Status.FINALIZED
+        ).values_list('id', flat=True).first()
+        if finalized_id is not None:
             logger.warning(f"[Task {task_id}] Schedule already finalized - aborting")
             return {
                 'status': 'ERROR',
                 'error': 'Schedule is already finalized and cannot be regenerated',
-                'schedule_id': str(schedule.id)
+                'schedule_id': str(finalized_id)
             }
 
-        # Update task state
-        self.update_state(
-            state='PROGRESS',
-            meta={
-                'step': 'building_model',
-                'description': f'Building constraint model ({len(data.doctors)} × {len(data.shifts)} variables)...'
-            }
-        )
+        # Only the user's id is needed for the generated_by column
+        user_id = _existing_user_id(user_id, task_id)
 
-        # Create and run solver
+        # Create and run solver, then save the solution to the database
         logger.info(f"[Task {task_id}] Running OR-Tools solver (timeout: {timeout_seconds}s)...")
-        solver = ScheduleSolver(data, timeout_seconds)
-        solution = solver.solve()
+        solution, schedule, violations = _run_solve(data, timeout_seconds, user_id, config_overrides, progress)
 
         logger.info(f"[Task {task_id}] Solver finished: {solution.status} in {solution.solver_time:.2f}s")
-
-        # Update task state
-        self.update_state(
-            state='PROGRESS',
-            meta={
-                'step': 'saving_solution',
-                'description': f'Saving {len(solution.assignments)} assignments to database...'
-            }
-        )
-
-        # Get user object if provided
-        generated_by = None
-        if user_id:
-            from doctors.models import Doctor
-            try:
-                generated_by = Doctor.objects.get(id=user_id)
-            except Doctor.DoesNotExist:
-                logger.warning(f"[Task {task_id}] User {user_id} not found")
-
-        # Save solution to database
-        schedule = save_solution(solution, data, generated_by)
-
         logger.info(f"[Task {task_id}] Schedule saved: {schedule.id}")
 
         # Prepare result summary
-        result = {
-            'status': 'SUCCESS' if solution.is_feasible else 'INFEASIBLE',
-            'schedule_id': str(schedule.id),
-            'solver_status': solution.status,
-            'solver_time': solution.solver_time,
-            'assignment_count': len(solution.assignments),
-            'objective_value': solution.objective_value,
-            'violation_count': schedule.violations.count(),
-            'generated_at': timezone.now().isoformat(),
-        }
+        result = _build_result(solution, schedule, violations)
 
         if solution.is_feasible:
             logger.info(f"[Task {task_id}] ✓ Schedule generation successful")
         else:
             logger.warning(f"[Task {task_id}] ⚠️  No feasible solution found")
-            result['error'] = 'No feasible solution found - constraints may be too restrictive'
 
         return result
 
     except Exception as e:
         logger.error(f"[Task {task_id}] Error during schedule generation: {str(e)}", exc_info=True)
 
-        # Try to update schedule status if it exists
-        try:
-            schedule = Schedule.objects.get(month=month, year=year)
-            schedule.solver_status = 'ERROR'
-            schedule.notes = f"Generation failed: {str(e)}"
-            schedule.save()
-        except Schedule.DoesNotExist:
-            pass
+        # Flag the schedule if it exists; a single UPDATE that matches no row is harmless
+        Schedule.objects.filter(month=month, year=year).update(
+            solver_status='ERROR',
+            notes=f"Generation failed: {str(e)}",
+            updated_at=timezone.now(),
+        )
 
         return {
             'status': 'ERROR',
@@ -130,37 +203,91 @@ def generate_schedule_task(self, month: int, year: int, user_id=None, timeout_se
         }
 
 
-@shared_task(name='tasks.generate_schedule_with_retry')
-def generate_schedule_with_retry(month: int, year: int, user_id=None, max_retries: int = 2):
+@shared_task(bind=True, name='tasks.generate_schedule')
+def generate_schedule_task(self, month: int, year: int, user_id=None, timeout_seconds: int = 300,
+                           track_progress: bool = False):
+    """
+    Asynchronous Celery task for generating a monthly schedule.
+
+    Args:
+        month: Month to generate schedule for (1-12)
+        year: Year to generate schedule for
+        user_id: ID of user who initiated generation (optional)
+        timeout_seconds: Maximum solver time in seconds (default: 300 = 5 minutes)
+        track_progress: Publish PROGRESS states to the result backend; pass True
+            only when a client is polling for progress
+
+    Returns:
+        dict: Result summary with status, schedule_id, and statistics
+    """
+    task_id = self.request.id
+    logger.info(f"[Task {task_id}] Starting schedule generation for {year}-{month:02d}")
+
+    # Each update_state is a synchronous result-backend write, so skip them
+    # when nobody is listening
+    progress = None
+    if track_progress and not self.request.called_directly:
+        def progress(step, description):
+            self.update_state(state='PROGRESS', meta={'step': step, 'description': description})
+
+    return _generate_schedule(month, year, user_id, timeout_seconds, progress=progress, task_id=task_id)
+
+
+@shared_task(bind=True, name='tasks.generate_schedule_with_retry')
+def generate_schedule_with_retry(self, month: int, year: int, user_id=None, max_retries: int = 2,
+                                 timeout_seconds: int = 300):
     """
     Generate schedule with automatic retry and relaxed constraints on failure.
 
     This task will:
     1. Attempt generation with default constraints
-    2. If infeasible, retry with relaxed constraints (e.g., max_consecutive_shifts = 5)
+    2. If infeasible, retry with relaxed constraints (see RELAXATION_STEPS)
     3. If still infeasible, provide detailed error report
 
+    Scheduling data is loaded once and shared by every attempt.
+
     Args:
         month: Month to generate
         year: Year to generate
         user_id: User ID who initiated
         max_retries: Maximum number of retries with relaxed constraints
+        timeout_seconds: Maximum solver time per attempt in seconds
 
     Returns:
         dict: Result summary
     """
+    task_id = self.request.id
     logger.info(f"Starting schedule generation with retry for {year}-{month:02d}")
 
+    try:
+        data = SchedulerData(month, year)
+    except Exception as e:
+        logger.error(f"[Task {task_id}] Error loading scheduling data: {str(e)}", exc_info=True)
+        return {
+            'status': 'ERROR',
+            'error': str(e),
+            'task_id': task_id
+        }
+
     # First attempt with normal constraints
-    result = generate_schedule_task.apply(args=[month, year, user_id]).get()
+    result = _generate_schedule(month, year, user_id, timeout_seconds, data=data, task_id=task_id)
 
-    if result['status'] == 'SUCCESS':
+    # Only an infeasible solve is worth relaxing; errors are returned as-is
+    if result['status'] != 'INFEASIBLE':
         return result
 
     logger.warning(f"Initial attempt failed: {result.get('error', 'Unknown')}")
 
-    # TODO: Implement constraint relaxation logic
-    # For now, just return the failure
+    for attempt, overrides in enumerate(RELAXATION_STEPS[:max_retries], start=1):
+        logger.info(f"Retry {attempt}/{max_retries} with relaxed constraints: {overrides}")
+        result = _generate_schedule(
+            month, year, user_id, timeout_seconds,
+            data=data, config_overrides=overrides, task_id=task_id
+        )
+        result['relaxed_constraints'] = overrides
+        if result['status'] != 'INFEASIBLE':
+            break
+
     return result
 
 
@@ -184,15 +311,18 @@ def validate_schedule_task(schedule_id: str):
     logger.info(f"Validating schedule {schedule_id}")
 
     try:
-        schedule = Schedule.objects.get(id=schedule_id)
+        schedule = Schedule.objects.only('id', 'month', 'year').get(id=schedule_id)
 
         # Load data for the schedule's month/year
         data = SchedulerData(schedule.month, schedule.year)
 
-        # Get assignments and convert to solution format
+        # Get assignments and convert to solution format; only the two FK columns
+        # are needed, so skip building ShiftAssignment instances
+        doctor_index = data.doctor_index
+        shift_index = data.shift_index
         assignments = [
-            (data.doctor_index[a.doctor.id], data.shift_index[a.shift.id])
-            for a in schedule.assignments.all()
+            (doctor_index[doctor_id], shift_index[shift_id])
+            for doctor_id, shift_id in schedule.assignments.values_list('doctor_id', 'shift_id')
         ]
 
         # Create a mock solution for validation
@@ -203,10 +333,11 @@ def validate_schedule_task(schedule_id: str):
             objective_value=len(assignments)
         )
 
-        # Run validation
+        # Run validation; assignments may have been edited since generation, so the
+        # stored assignment count is refreshed in the same UPDATE as violation_count
         parser = SolutionParser(solution, data)
         parser._detect_violations(schedule)
-        parser._save_violations(schedule)
+        parser._save_violations(schedule, assignment_count=len(assignments))
 
         logger.info(f"Validation complete: {len(parser.violations)} violations found")
 
@@ -214,14 +345,7 @@ def validate_schedule_task(schedule_id: str):
             'status': 'SUCCESS',
             'schedule_id': str(schedule.id),
             'violation_count': len(parser.violations),
-            'violations': [
-                {
-                    'type': v['violation_type'],
-                    'severity': v['severity'],
-                    'description': v['description']
-                }
-                for v in parser.violations
-            ]
+            'violations': _serialize_violations(parser.violations)
         }
 
     except Schedule.DoesNotExist: